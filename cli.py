@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Headless command line for Stohrer Sax Pad SVG Generator.
+
+Nests and writes SVG/G-code files without Tk, for scripted and overnight
+jobs. Each pad list file (same "18.0 x 5" / "18.0 x max" lines as the app)
+or manifest row is one order. Every material of every order is fanned out
+across the worker pool in the same process. One JSON line is printed per
+material, then a summary line.
+
+Usage:
+    python -m cli pads.txt                                # SVGs, sheet size and materials from the app settings
+    python -m cli a.txt b.txt --format svg gcode --out-dir out/
+    python -m cli pads.txt --materials felt --width 12 --height 8 --units in
+    python -m cli pads.txt --polygon shape.json --settings app_settings.json
+    python -m cli --manifest orders.csv --format svg gcode --out-dir out/
+    python -m cli --watch inbox/ --out-dir outbox/ --format svg gcode
+
+Manifests are CSV (with a header row) or JSON (a list of objects) with the
+columns/keys name, pads, materials, width, height, units, polygon, hole,
+roll and multi_sheet. Only pads is required; the rest default to the
+command-line options. Pad lines in one cell are separated by ';' (JSON may
+also give a list), materials by spaces, commas or ';', and polygon paths
+are relative to the manifest. A CSV report of every order is written next
+to the outputs.
+
+Watch mode polls an inbox for pad list (.txt) and order (.json/.csv) files,
+writes their cut files and a report to the outbox, and moves each file to
+inbox/done/ or inbox/failed/. Output names already used in the outbox get
+a timestamp, so re-dropped orders never overwrite earlier ones. Settings
+are re-read for every file, so changes saved in the app apply to the next
+order. Stop it with Ctrl+C.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from config import load_settings, parse_pad_list
+from generation_jobs import (
+    fit_material_job, write_material_job, run_jobs, output_filenames,
+    layout_utilization, shutdown_pool, freeze_support
+)
+
+MATERIALS = ['felt', 'card', 'leather', 'exact_size']
+UNIT_TO_MM = {'in': 25.4, 'cm': 10.0, 'mm': 1.0}
+WATCH_EXTENSIONS = ('.txt', '.json', '.csv')
+REPORT_FIELDS = ['job', 'material', 'status', 'sheets', 'placed', 'height_mm', 'utilization',
+                 'nest_s', 'write_s', 'runtime_s', 'files', 'error']
+
+
+def hole_dia_from_settings(settings):
+    """Center hole diameter (mm) for the app's saved hole option."""
+    option = settings.get("hole_option", "No center holes")
+    if option == "3.5mm":
+        return 3.5
+    if option == "3.0mm":
+        return 3.0
+    if option == "Custom":
+        return float(settings.get("custom_hole_size", "4.0"))
+    return 0
+
+
+def load_polygon(path):
+    """Read a sheet shape: a JSON list of [x, y] points in mm."""
+    with open(path, 'r') as f:
+        points = json.load(f)
+    return [(float(x), float(y)) for x, y in points]
+
+
+def _truthy(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y', 'x')
+    return bool(value)
+
+
+def _split_list(value):
+    if isinstance(value, list):
+        return [str(v).strip().lower() for v in value]
+    return [v.lower() for v in re.split(r'[\s,;]+', str(value).strip()) if v]
+
+
+def _safe_name(name, default):
+    """An order name usable as a filename base: no directories, never empty."""
+    name = re.split(r'[\\/]', str(name if name is not None else '').strip())[-1].strip()
+    return name if name not in ('', '.', '..') else default
+
+
+def load_manifest(path, defaults):
+    """
+    Read orders from a CSV or JSON manifest (a JSON object is a single order).
+
+    Args:
+        defaults: order dict with the command-line 'materials', 'width_mm',
+                  'height_mm', 'polygon', 'hole_dia', 'roll' and 'multi_sheet'
+
+    Returns:
+        list of order dicts (see run_orders); rows that cannot be read keep
+        their 'error' so the rest of the batch still runs. Unnamed orders are
+        named after the file (plus their row number, when there are several);
+        directory parts of a name are dropped.
+    """
+    with open(path, 'r', newline='') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    if isinstance(rows, dict):
+        rows = [rows]  # A single order
+    manifest_dir = os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+
+    if not isinstance(rows, list):
+        raise ValueError("manifest must be a list of orders")
+
+    orders = []
+    for number, row in enumerate(rows, 1):
+        default_name = stem if len(rows) == 1 else f"{stem}_{number}"
+        order = dict(defaults, name=default_name, pad_text='', error=None)
+        try:
+            if not isinstance(row, dict):
+                raise ValueError(f"order {number} is not an object")
+            row = {str(k).strip().lower(): v for k, v in row.items() if k and v not in (None, '')}
+            order['name'] = _safe_name(row.get('name'), default_name)
+            pads = row.get('pads', '')
+            order['pad_text'] = "\n".join(pads) if isinstance(pads, list) else str(pads).replace(';', "\n")
+            if 'materials' in row:
+                order['materials'] = _split_list(row['materials'])
+                unknown = [m for m in order['materials'] if m not in MATERIALS]
+                if unknown:
+                    raise ValueError(f"unknown material(s): {', '.join(unknown)}")
+            units = str(row.get('units', defaults['units'])).strip().lower()
+            if units not in UNIT_TO_MM:
+                raise ValueError(f"unknown unit '{units}'")
+            if 'width' in row:
+                order['width_mm'] = float(row['width']) * UNIT_TO_MM[units]
+            if 'height' in row:
+                order['height_mm'] = float(row['height']) * UNIT_TO_MM[units]
+            if 'polygon' in row:
+                order['polygon'] = load_polygon(os.path.join(manifest_dir, row['polygon']))
+            if 'hole' in row:
+                order['hole_dia'] = float(row['hole'])
+            if 'roll' in row:
+                order['roll'] = _truthy(row['roll'])
+            if 'multi_sheet' in row:
+                order['multi_sheet'] = _truthy(row['multi_sheet'])
+        except (OSError, ValueError, TypeError) as e:
+            order['error'] = str(e)
+        orders.append(order)
+    return orders
+
+
+def pad_file_order(path, defaults, name=None):
+    """An order for a plain pad list file, named after the file."""
+    order = dict(defaults, name=name or os.path.splitext(os.path.basename(path))[0], error=None)
+    try:
+        with open(path, 'r') as f:
+            order['pad_text'] = f.read()
+    except OSError as e:
+        order['pad_text'], order['error'] = '', str(e)
+    return order
+
+
+def emit(record):
+    """Print one machine-readable result line."""
+    print(json.dumps(record), flush=True)
+
+
+def _failed_record(name, material, error):
+    return {'job': name, 'material': material, 'status': 'error', 'fits': False, 'placed': 0, 'sheets': 0,
+            'height_mm': None, 'utilization': 0.0, 'nest_s': 0.0, 'write_s': 0.0,
+            'files': [], 'error': error}
+
+
+def _order_jobs(order, settings, formats):
+    """Fit jobs for one order, plus failed records for whatever cannot run."""
+    error = order.get('error')
+    pads = parse_pad_list(order['pad_text']) if not error else []
+    if not error and not pads:
+        error = "No valid pad sizes entered."
+    elif not error and sum(1 for p in pads if p['qty'] == 'max') > 1:
+        error = "Only one pad size can use 'max' quantity at a time."
+    if error:
+        return [], [_failed_record(order['name'], None, error)]
+
+    roll = order['roll'] and order['polygon'] is None
+    jobs, failed = [], []
+    for material in order['materials']:
+        if material == 'exact_size' and 'gcode' in formats:
+            failed.append(_failed_record(order['name'], material, "G-code is not supported for exact_size."))
+            continue
+        jobs.append({
+            'material': material, 'pads': pads,
+            'width_mm': order['width_mm'], 'height_mm': order['height_mm'], 'polygon': order['polygon'],
+            'settings': settings, 'roll': roll, 'multi_sheet': order['multi_sheet'] and not roll
+        })
+    return jobs, failed
+
+
+def run_orders(orders, settings, formats, out_dir):
+    """
+    Nest and write every order, all materials of all orders together in the pool.
+
+    Args:
+        orders: list of dicts with 'name' (output filename base; repeated
+                names get a _2, _3... suffix), 'pad_text',
+                'materials', 'width_mm', 'height_mm', 'polygon', 'hole_dia',
+                'roll', 'multi_sheet' and optionally 'error'
+
+    Returns:
+        list of per-material records, grouped by order, each also printed
+    """
+    names = set()
+    for order in orders:
+        # Orders sharing a name would write over each other's files
+        name, count = order['name'], 1
+        while order['name'] in names:
+            count += 1
+            order['name'] = f"{name}_{count}"
+        names.add(order['name'])
+
+    jobs, owners, order_records = [], [], []
+    for n, order in enumerate(orders):
+        order_jobs, failed = _order_jobs(order, settings, formats)
+        order_records.append(failed)
+        jobs.extend(order_jobs)
+        owners.extend([n] * len(order_jobs))
+
+    job_records = []
+    for job, n, fit in zip(jobs, owners, run_jobs(fit_material_job, jobs)):
+        job['placed'], job['sheets'], job['height_mm'] = fit['placed'], fit['sheets'], fit['height_mm']
+        error, status = fit['error'], 'error' if fit['error'] else 'ok'
+        if not error and fit['timed_out']:
+            error = "Nesting hit the effort time limit before every piece was placed; try a higher --effort."
+            status = 'timed out'
+        elif not error and not fit['fits']:
+            error = "Could not fit all pieces on the sheet." + (f" {fit['reason']}" if fit['reason'] else "")
+            status = 'no fit'
+        job_records.append({
+            'job': orders[n]['name'], 'material': job['material'], 'status': status, 'fits': fit['fits'],
+            'placed': len(fit['placed']), 'sheets': len(fit['sheets'] or [None]),
+            'height_mm': round(fit['height_mm'], 1),
+            'utilization': round(layout_utilization(job, fit), 4),
+            'nest_s': round(fit['elapsed_s'], 3), 'write_s': 0.0, 'files': [], 'error': error
+        })
+
+    fitted = [i for i, record in enumerate(job_records) if record['error'] is None]
+    for output in formats:
+        write_jobs = [dict(jobs[i], output=output, hole_dia=orders[owners[i]]['hole_dia'],
+                           filenames=output_filenames(out_dir, orders[owners[i]]['name'], jobs[i], output))
+                      for i in fitted]
+        for i, result in zip(fitted, run_jobs(write_material_job, write_jobs)):
+            record = job_records[i]
+            record['write_s'] = round(record['write_s'] + result['elapsed_s'], 3)
+            if result['error']:
+                record['error'], record['status'] = result['error'], 'error'
+            else:
+                record['files'].extend(result['filenames'])
+
+    for n, record in zip(owners, job_records):
+        order_records[n].append(record)
+    records = [record for group in order_records for record in group]
+    for record in records:
+        emit(record)
+    return records
+
+
+def write_report(path, records):
+    """Write a CSV summary with one row per order and material."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({
+                'job': record['job'], 'material': record['material'] or '', 'status': record['status'],
+                'sheets': record['sheets'], 'placed': record['placed'], 'height_mm': record['height_mm'],
+                'utilization': record['utilization'], 'nest_s': record['nest_s'], 'write_s': record['write_s'],
+                'runtime_s': round(record['nest_s'] + record['write_s'], 3),
+                'files': ";".join(os.path.basename(f) for f in record['files']), 'error': record['error'] or ''
+            })
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate pad SVG/G-code files without the GUI.")
+    parser.add_argument('pad_files', nargs='*', help="Pad list file(s); each file is one order")
+    parser.add_argument('--manifest', help="CSV or JSON order manifest (one order per row)")
+    parser.add_argument('--watch', metavar='INBOX', help="Keep running and process order files dropped into INBOX")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between inbox scans (default: 2)")
+    parser.add_argument('--report', help="Summary report CSV (default: batch_report.csv in --out-dir, for manifests)")
+    parser.add_argument('--materials', nargs='+', choices=MATERIALS, default=['felt', 'card', 'leather'])
+    parser.add_argument('--format', nargs='+', choices=['svg', 'gcode'], default=['svg'], dest='formats')
+    parser.add_argument('--width', type=float, help="Sheet width (default: app setting)")
+    parser.add_argument('--height', type=float, help="Sheet height (default: app setting)")
+    parser.add_argument('--units', choices=sorted(UNIT_TO_MM), help="Units of --width/--height (default: app setting)")
+    parser.add_argument('--polygon', help="JSON file with the sheet outline as [x, y] points in mm")
+    parser.add_argument('--settings', help="Settings JSON file (default: the app's saved settings)")
+    parser.add_argument('--effort', choices=['fast', 'balanced', 'thorough'], help="Nesting effort override")
+    parser.add_argument('--hole', type=float, help="Center hole diameter in mm (default: app setting)")
+    parser.add_argument('--roll', action='store_true', help="Roll stock: find the shortest sheet length")
+    parser.add_argument('--multi-sheet', action='store_true', help="Split each material across as many sheets as needed")
+    parser.add_argument('--out-dir', help="Output directory (default: current directory, or INBOX/outbox when watching)")
+    parser.add_argument('--name', help="Output filename base (default: pad file name; single pad file only)")
+    return parser
+
+
+def load_run_settings(args):
+    """
+    Settings and order defaults for a run: load_settings() overlaid with
+    the command-line options. Raises ValueError/OSError for bad input.
+    """
+    settings = load_settings(args.settings)
+    if args.effort:
+        settings["effort"] = args.effort
+
+    units = args.units or settings['units']
+    if units not in UNIT_TO_MM:
+        raise ValueError(f"unknown unit '{units}' in settings")
+    width = args.width if args.width is not None else float(settings["sheet_width"])
+    height = args.height if args.height is not None else float(settings["sheet_height"])
+    defaults = {
+        'materials': args.materials, 'units': units,
+        'width_mm': width * UNIT_TO_MM[units], 'height_mm': height * UNIT_TO_MM[units],
+        'polygon': load_polygon(args.polygon) if args.polygon else None,
+        'hole_dia': args.hole if args.hole is not None else hole_dia_from_settings(settings),
+        'roll': args.roll, 'multi_sheet': args.multi_sheet
+    }
+    return settings, defaults
+
+
+def _summary(orders, records, started, report):
+    failed = sum(1 for r in records if r['error'])
+    return {'summary': True, 'jobs': len(orders), 'materials': len(records), 'failed': failed,
+            'sheets': sum(r['sheets'] for r in records if not r['error']),
+            'total_s': round(time.perf_counter() - started, 3), 'report': report}
+
+
+def process_order_file(path, args):
+    """
+    Nest and write one dropped order file (watch mode) and report it in the outbox.
+
+    Returns:
+        True if every material of every order in the file was written
+    """
+    started = time.perf_counter()
+    try:
+        settings, defaults = load_run_settings(args)
+        if path.lower().endswith('.txt'):
+            orders = [pad_file_order(path, defaults)]
+        else:
+            orders = load_manifest(path, defaults)
+    except (OSError, ValueError, TypeError, AttributeError, csv.Error) as e:
+        orders = [dict(name=os.path.splitext(os.path.basename(path))[0], pad_text='', error=str(e))]
+        settings = None
+
+    # A re-dropped file, or order.txt after order.csv, must not overwrite the outbox
+    stamp = f"{datetime.now():%Y%m%d-%H%M%S-%f}"
+    taken = os.listdir(args.out_dir)
+    for order in orders:
+        order['name'] = _unused_base(order['name'], taken, stamp)
+    report_base = _unused_base(os.path.splitext(os.path.basename(path))[0], taken, stamp)
+
+    records = run_orders(orders, settings, args.formats, args.out_dir)
+    report = os.path.join(args.out_dir, report_base + "_report.csv")
+    write_report(report, records)
+    summary = _summary(orders, records, started, report)
+    emit(dict(summary, order_file=os.path.basename(path)))
+    return bool(records) and not summary['failed']
+
+
+def _unused_base(base, names, stamp):
+    """base, plus stamp if any of names (outbox files) already starts with it."""
+    prefix = base + "_"
+    return f"{base}_{stamp}" if any(name.startswith(prefix) for name in names) else base
+
+
+def _move_unique(path, directory):
+    """Move path into directory, adding a timestamp if the name is taken."""
+    name = os.path.basename(path)
+    target = os.path.join(directory, name)
+    if os.path.exists(target):
+        stem, ext = os.path.splitext(name)
+        target = os.path.join(directory, f"{stem}_{datetime.now():%Y%m%d-%H%M%S-%f}{ext}")
+    os.replace(path, target)
+
+
+def watch(inbox, args):
+    """
+    Poll inbox for order files until interrupted. A file is processed once
+    its size is unchanged between two scans, so copies over a shared folder
+    are never read half-written. The worker pool stays warm throughout.
+    """
+    done_dir = os.path.join(inbox, "done")
+    failed_dir = os.path.join(inbox, "failed")
+    os.makedirs(done_dir, exist_ok=True)
+    os.makedirs(failed_dir, exist_ok=True)
+    emit({'watching': os.path.abspath(inbox), 'out_dir': os.path.abspath(args.out_dir)})
+
+    sizes = {}
+    try:
+        while True:
+            seen = {}
+            for name in sorted(os.listdir(inbox)):
+                path = os.path.join(inbox, name)
+                if (name.startswith(('.', '~')) or not name.lower().endswith(WATCH_EXTENSIONS)
+                        or not os.path.isfile(path)):
+                    continue
+                try:
+                    seen[path] = os.path.getsize(path)
+                except OSError:
+                    continue
+                if sizes.get(path) != seen[path]:
+                    continue  # New or still being copied
+                try:
+                    ok = process_order_file(path, args)
+                except Exception as e:  # One bad order file must not stop the daemon
+                    print(f"Error: {name} failed: {e}", file=sys.stderr)
+                    ok = False
+                try:
+                    _move_unique(path, done_dir if ok else failed_dir)
+                except OSError as e:
+                    print(f"Warning: could not move {name}: {e}", file=sys.stderr)
+                seen.pop(path)
+            sizes = seen
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_pool()
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.watch and (args.pad_files or args.manifest):
+        parser.error("--watch does not take pad files or --manifest")
+    if not args.pad_files and not args.manifest and not args.watch:
+        parser.error("give pad list file(s), --manifest or --watch")
+    if args.settings and not os.path.exists(args.settings):
+        parser.error(f"settings file not found: {args.settings}")
+    if 'gcode' in args.formats and 'exact_size' in args.materials:
+        parser.error("G-code is not supported for exact_size")
+    if args.name and (len(args.pad_files) != 1 or args.manifest):
+        parser.error("--name only applies to a single pad file")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+
+    try:
+        settings, defaults = load_run_settings(args)
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(str(e))
+
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            parser.error(f"inbox not found: {args.watch}")
+        args.out_dir = args.out_dir or os.path.join(args.watch, "outbox")
+        os.makedirs(args.out_dir, exist_ok=True)
+        return watch(args.watch, args)
+
+    try:
+        orders = load_manifest(args.manifest, defaults) if args.manifest else []
+    except (OSError, ValueError, TypeError, AttributeError, csv.Error) as e:
+        parser.error(str(e))
+    orders.extend(pad_file_order(path, defaults, args.name) for path in args.pad_files)
+
+    args.out_dir = args.out_dir or '.'
+    os.makedirs(args.out_dir, exist_ok=True)
+    started = time.perf_counter()
+    try:
+        records = run_orders(orders, settings, args.formats, args.out_dir)
+    finally:
+        shutdown_pool()
+
+    report = args.report or (os.path.join(args.out_dir, "batch_report.csv") if args.manifest else None)
+    if report:
+        write_report(report, records)
+
+    summary = _summary(orders, records, started, report)
+    emit(summary)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
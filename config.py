@@ -2,7 +2,6 @@ import os
 import sys
 import json
 import shutil
-from tkinter import messagebox
 
 # ==========================================
 # PLATFORM-SPECIFIC CONFIG DIRECTORY
@@ -160,7 +159,35 @@ DEFAULT_SETTINGS = {
     "dart_engraving_loc": {"mode": "from_outside", "value": 2.5},
 
     # MAX FILL SETTINGS
-    "max_fill_style": "center_out",  # "center_out" or "longest_edge"
+    "max_fill_style": "center_out",  # "center_out" or "longest_edge" (scan pattern only)
+    "max_fill_pattern": "scan",  # "scan" (one disc at a time) or "lattice" (hex/square grid in one pass)
+
+    # NESTING ENGINE
+    "nesting_engine": "raster",  # "raster", "tangent", "numpy" or "bitset"
+
+    # NESTING EFFORT - "fast" (previews, quotes), "balanced" or "thorough" (final cut files)
+    "effort": "balanced",
+
+    # NESTING RESOLUTION (mm) - below 1.0 enables a coarse-to-fine sub-millimetre search
+    "nesting_resolution": {
+        "felt": 1.0,
+        "card": 1.0,
+        "leather": 1.0,
+        "exact_size": 1.0
+    },
+
+    # COMPACTION - slide discs together after nesting, then refill freed room with 'max' pads
+    "compaction": False,
+
+    # MULTI-START SEARCH - best of many perturbed nests within a time budget (seconds, 0 = off)
+    "multistart_budget": 5.0,
+    "multistart_always": False,  # False = only when the greedy nest strands fixed pads
+
+    # ROLL STOCK - sheet height becomes the shortest length that fits all fixed pads
+    "roll_stock_mode": False,
+
+    # MULTI-SHEET - split an order that doesn't fit across numbered sheets
+    "multi_sheet_mode": False,
 
     # CARD PAPER SIZE SETTINGS
     "card_use_paper_size": False,
@@ -246,10 +273,12 @@ DEFAULT_SETTINGS = {
 # IO FUNCTIONS
 # ==========================================
 
-def load_settings():
-    if os.path.exists(SETTINGS_FILE):
+def load_settings(path=None):
+    """Load settings from path (default: the app's settings file), merged over DEFAULT_SETTINGS."""
+    path = path or SETTINGS_FILE
+    if os.path.exists(path):
         try:
-            with open(SETTINGS_FILE, 'r') as f:
+            with open(path, 'r') as f:
                 loaded_settings = json.load(f)
                 settings = DEFAULT_SETTINGS.copy()
 
@@ -273,6 +302,7 @@ def save_settings(settings):
         with open(SETTINGS_FILE, 'w') as f:
             json.dump(settings, f, indent=2)
     except Exception as e:
+        from tkinter import messagebox
         messagebox.showerror("Error Saving Settings", f"Could not save settings:\n{e}")
 
 def load_presets(file_path, preset_type_name="Preset"):
@@ -291,6 +321,7 @@ def load_presets(file_path, preset_type_name="Preset"):
         print(f"Migrating old {preset_type_name} file...")
         new_data = {"My Presets": data}
         if save_presets(new_data, file_path):
+            from tkinter import messagebox
             messagebox.showinfo("Library Updated", f"Your existing {preset_type_name} sets have been moved into a new library called 'My Presets'.")
             return new_data
         else:
@@ -305,5 +336,38 @@ def save_presets(presets, file_path):
             json.dump(presets, f, indent=2)
         return True
     except Exception as e:
+        from tkinter import messagebox
         messagebox.showerror("Error Saving Preset", str(e))
         return False
+
+# ==========================================
+# PAD LIST PARSING
+# ==========================================
+
+def parse_pad_list(pad_input):
+    """
+    Parse pad input. Supports:
+    - Regular: "18.0 x 5" (size x quantity)
+    - Max fill: "18.0 x max" (fill remaining space with this size)
+    Only one pad size can use "max" at a time.
+    """
+    pad_list = []
+    for line in pad_input.strip().splitlines():
+        line = line.strip().lower()
+        if not line:
+            continue
+        try:
+            parts = line.split('x', 1)  # Split only on first 'x' (so 'max' doesn't get split)
+            if len(parts) != 2:
+                continue
+            size = float(parts[0].strip())
+            if size <= 0:
+                continue
+            qty_str = parts[1].strip()
+            if qty_str == 'max':
+                pad_list.append({'size': size, 'qty': 'max'})
+            else:
+                pad_list.append({'size': size, 'qty': int(float(qty_str))})
+        except ValueError:
+            continue
+    return pad_list
@@ -388,10 +388,10 @@ def generate_gcode(pads, material, sheet_width_mm, sheet_height_mm, filename,
         settings: App settings dictionary
         polygon: Optional custom polygon shape
     """
-    from svg_engine import _nest_discs, get_felt_thickness_mm
+    from svg_engine import nest_discs_cached, get_felt_thickness_mm
 
-    # Use the same nesting as SVG generation
-    placed, _, _ = _nest_discs(pads, material, sheet_width_mm, sheet_height_mm, settings, polygon=polygon)
+    # Use the same nesting as SVG generation (shared cache with the fit check and SVG output)
+    placed, _, _ = nest_discs_cached(pads, material, sheet_width_mm, sheet_height_mm, settings, polygon=polygon)
 
     if not placed:
         return
@@ -0,0 +1,311 @@
+"""
+Per-material generation jobs for Stohrer Sax Pad SVG Generator.
+
+Each selected material is nested and written independently of the others,
+so the jobs can run side by side in a process pool. Every job returns a
+plain result dict (errors included) so one failing material never hides
+the results of the rest.
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# How often run_material_jobs relays worker progress and checks for cancellation
+PROGRESS_POLL_S = 0.1
+
+_pool = None
+_manager = None
+
+
+def _job_progress(job):
+    """
+    Progress callback for a job: the caller's own callback when running
+    in-process, or a relay through the pool's shared queue. Reports carry
+    the job's material so several jobs can share one progress display.
+    """
+    if job.get('progress') is not None:
+        return job['progress']
+    progress_queue = job.get('progress_queue')
+    if progress_queue is None:
+        return None
+    material = job['material']
+    return lambda info: progress_queue.put(dict(info, material=material))
+
+
+def fit_material_job(job):
+    """
+    Nest one material and report whether every fixed-quantity pad fits.
+
+    Args:
+        job: dict with 'material', 'pads', 'width_mm', 'height_mm', 'polygon', 'settings'
+             and optionally 'roll' (find the shortest height instead of using height_mm)
+             or 'multi_sheet' (split the order across as many sheets as needed);
+             'progress' / 'progress_queue' and 'cancel' are set by run_material_jobs
+
+    Returns:
+        dict with 'material', 'fits', 'placed', 'sheets' (one layout per sheet
+        in multi-sheet mode), 'height_mm' (the roll length in roll mode),
+        'reason' (why it certainly cannot fit, if known), 'timed_out' (the
+        effort time cap stopped the nest, so 'fits' False is no verdict),
+        'elapsed_s' and 'error' (None on success). A cancelled job returns
+        the partial layout it had, with 'fits' False.
+    """
+    started = time.perf_counter()
+    result = _fit_material(job)
+    result['elapsed_s'] = time.perf_counter() - started
+    return result
+
+
+def _fit_material(job):
+    """fit_material_job without the timing."""
+    from svg_engine import nest_discs_for_fit, fit_precheck, nest_min_length, plan_sheets
+    from nest_bounds import IMPOSSIBLE
+
+    result = {'material': job['material'], 'fits': False, 'placed': [], 'sheets': None,
+              'height_mm': job['height_mm'], 'reason': None, 'timed_out': False, 'error': None}
+    cancel = job.get('cancel')
+    try:
+        if job.get('multi_sheet'):
+            sheets = plan_sheets(job['pads'], job['material'], job['width_mm'], job['height_mm'],
+                                 job['settings'], polygon=job.get('polygon'),
+                                 progress=_job_progress(job), cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                # Partial plan: the sheets filled so far, no verdict
+                result['sheets'] = sheets or None
+                result['placed'] = [disc for placed in sheets or [] for disc in placed]
+                return result
+            if sheets is None:
+                result['reason'] = "A pad does not fit even on an empty sheet."
+                return result
+            result['sheets'] = sheets
+            result['placed'] = [disc for placed in sheets for disc in placed]
+            result['fits'] = True
+            return result
+
+        if job.get('roll'):
+            length, nested = nest_min_length(job['pads'], job['material'], job['width_mm'], job['settings'],
+                                             progress=_job_progress(job), cancel=cancel)
+            if cancel is not None and cancel.is_set():
+                # Partial search: the best layout found so far, no verdict
+                if length is not None:
+                    result['height_mm'] = length
+                result['placed'] = nested[0] if nested is not None else []
+                return result
+            if length is None:
+                if nested is not None:
+                    result['timed_out'] = True
+                else:
+                    result['reason'] = "No fixed-quantity pads to size the roll for, or a pad is wider than the roll."
+                return result
+            result['height_mm'] = length
+            result['placed'] = nested[0]
+            result['fits'] = nested[1] == nested[2]
+            return result
+
+        verdict, result['reason'] = fit_precheck(
+            job['pads'], job['material'], job['width_mm'], job['height_mm'],
+            job['settings'], polygon=job.get('polygon'))
+        if verdict == IMPOSSIBLE:
+            return result
+        nested = nest_discs_for_fit(
+            job['pads'], job['material'], job['width_mm'], job['height_mm'],
+            job['settings'], polygon=job.get('polygon'),
+            progress=_job_progress(job), cancel=job.get('cancel'))
+        placed, fixed_placed, fixed_total = nested
+        result['placed'] = placed
+        result['fits'] = fixed_placed == fixed_total
+        result['timed_out'] = nested.timed_out and not result['fits']
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def write_material_job(job):
+    """
+    Write one material's SVG or G-code file(s) from already nested layouts.
+
+    Args:
+        job: dict with 'material', 'placed', 'width_mm', 'height_mm', 'polygon',
+             'settings', 'filenames', 'hole_dia' and 'output' ('svg' or 'gcode');
+             multi-sheet jobs carry 'sheets' (one layout per filename) instead of 'placed'
+
+    Returns:
+        dict with 'material', 'filenames', 'elapsed_s' and 'error' (None on success)
+    """
+    from svg_engine import generate_svg_from_placed
+    from gcode_engine import generate_gcode_from_placed
+
+    started = time.perf_counter()
+    result = {'material': job['material'], 'filenames': job['filenames'], 'error': None}
+    try:
+        writer = generate_gcode_from_placed if job['output'] == 'gcode' else generate_svg_from_placed
+        sheets = job.get('sheets') or [job['placed']]
+        for placed, filename in zip(sheets, job['filenames']):
+            writer(placed, job['material'], job['width_mm'], job['height_mm'],
+                   filename, job['hole_dia'], job['settings'], polygon=job.get('polygon'))
+    except Exception as e:
+        result['error'] = str(e)
+    result['elapsed_s'] = time.perf_counter() - started
+    return result
+
+
+def output_filenames(save_dir, base, job, ext):
+    """
+    Output paths for a material job; roll-mode files carry their length, and
+    multi-sheet files their number once the order spans more than one sheet.
+    """
+    if job.get('sheets') and len(job['sheets']) > 1:
+        return [os.path.join(save_dir, f"{base}_{job['material']}_sheet{n}.{ext}")
+                for n in range(1, len(job['sheets']) + 1)]
+    if job.get('roll'):
+        return [os.path.join(save_dir, f"{base}_{job['material']}_{job['height_mm']:.0f}mm.{ext}")]
+    return [os.path.join(save_dir, f"{base}_{job['material']}.{ext}")]
+
+
+def layout_utilization(job, fit_result):
+    """Fraction of the sheet area (all sheets, in multi-sheet mode) covered by nested discs."""
+    from nest_bounds import polygon_area
+
+    if job.get('polygon'):
+        sheet_area = polygon_area(job['polygon'])
+    else:
+        sheet_area = job['width_mm'] * fit_result['height_mm']
+    sheet_area *= len(fit_result['sheets'] or [None])
+    if sheet_area <= 0:
+        return 0.0
+    return sum(math.pi * r * r for _, _, _, r in fit_result['placed']) / sheet_area
+
+
+def pool_size():
+    """Number of worker processes in the shared pool."""
+    return max(1, min(4, (os.cpu_count() or 1)))
+
+
+def _ignore_interrupt():
+    """Pool worker initializer: Ctrl+C is handled by the parent, which shuts the pool down."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def get_pool():
+    """Shared worker pool, started on first use and kept warm between jobs."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=pool_size(), initializer=_ignore_interrupt)
+    return _pool
+
+
+def get_manager():
+    """
+    Shared multiprocessing manager, started on first use. Its Event and Queue
+    proxies carry cancellation and progress between the app and pool workers.
+    """
+    global _manager
+    if _manager is None:
+        _manager = multiprocessing.Manager()
+    return _manager
+
+
+def reset_pool():
+    """
+    Stop the shared worker pool (e.g. once a worker died and broke it) so the
+    next get_pool() starts a fresh one. The manager keeps running.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def shutdown_pool():
+    """Stop the shared worker pool (call on application exit)."""
+    global _manager
+    reset_pool()
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
+
+def _run_in_process(job_fn, jobs, progress, cancel):
+    """Run the jobs one after another in this process."""
+    results = []
+    for job in jobs:
+        job_progress = None
+        if progress is not None:
+            job_progress = lambda info, material=job['material']: progress(dict(info, material=material))
+        results.append(job_fn(dict(job, progress=job_progress, cancel=cancel)))
+    return results
+
+
+def _drain(progress_queue, progress):
+    """Pass every queued worker progress report on to progress."""
+    while True:
+        try:
+            info = progress_queue.get_nowait()
+        except queue.Empty:
+            return
+        progress(info)
+
+
+def run_jobs(job_fn, jobs, progress=None, cancel=None):
+    """
+    Run job_fn over jobs, in the worker pool when there is more than one.
+
+    Args:
+        progress: optional callable taking a nest progress dict (see
+                  svg_engine._NestMonitor) with the job's 'material' added
+        cancel: optional object with is_set(); once set, running jobs stop
+                early and return partial results
+
+    Returns:
+        list of job results, in the order of jobs
+    """
+    if len(jobs) <= 1:
+        return _run_in_process(job_fn, jobs, progress, cancel)
+
+    try:
+        pool = get_pool()
+        shared_cancel = progress_queue = None
+        pool_jobs = jobs
+        if progress is not None or cancel is not None:
+            manager = get_manager()
+            shared_cancel = manager.Event()
+            progress_queue = manager.Queue()
+            pool_jobs = [dict(job, cancel=shared_cancel, progress_queue=progress_queue) for job in jobs]
+        futures = [pool.submit(job_fn, job) for job in pool_jobs]
+
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=PROGRESS_POLL_S)
+            if progress is not None:
+                _drain(progress_queue, progress)
+            if cancel is not None and cancel.is_set():
+                shared_cancel.set()
+        return [future.result() for future in futures]
+    except (BrokenProcessPool, OSError) as e:
+        # Pool unavailable (e.g. a worker died) - fall back to running in-process
+        print(f"Warning: worker pool unavailable, running jobs in-process: {e}", file=sys.stderr)
+        reset_pool()
+        return _run_in_process(job_fn, jobs, progress, cancel)
+
+
+def run_material_jobs(job_fn, jobs, progress=None, cancel=None):
+    """
+    run_jobs for one order's jobs (one per material).
+
+    Returns:
+        dict mapping material -> job result, in the order of jobs
+    """
+    results = run_jobs(job_fn, jobs, progress=progress, cancel=cancel)
+    return {job['material']: result for job, result in zip(jobs, results)}
+
+
+def freeze_support():
+    """Let worker processes start correctly from a frozen (PyInstaller) build."""
+    multiprocessing.freeze_support()
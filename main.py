@@ -5,16 +5,23 @@ import json
 import shutil
 import sys
 import glob
+import queue
 import subprocess
+import threading
 
 # --- Local Imports ---
 from config import (
-    load_settings, save_settings, load_presets, save_presets,
+    load_settings, save_settings, load_presets, save_presets, parse_pad_list,
     PAD_PRESET_FILE, DEFAULT_SETTINGS,
     find_config_files_in_directory, import_config_files
 )
-from svg_engine import generate_svg, can_all_pads_fit, check_for_oversized_engravings, try_nest_partial, generate_svg_from_placed
-from gcode_engine import generate_gcode, generate_gcode_from_placed
+from svg_engine import (
+    check_for_oversized_engravings, try_nest_partial, generate_svg_from_placed, nest_discs_cached, CancelToken
+)
+from gcode_engine import generate_gcode_from_placed
+from generation_jobs import (
+    fit_material_job, write_material_job, run_material_jobs, output_filenames, shutdown_pool, freeze_support
+)
 from ui_dialogs import (
     OptionsWindow, LayerColorWindow,
     ResonanceWindow, ConfirmationDialog,
@@ -22,6 +29,13 @@ from ui_dialogs import (
     PolygonDrawWindow, GcodeSettingsWindow
 )
 
+# How often the Tk loop checks on a background generation job
+JOB_POLL_MS = 100
+
+# Live preview: wait this long after the last edit before nesting
+PREVIEW_DELAY_MS = 300
+PREVIEW_MARGIN_PX = 6
+
 # ==========================================
 # MAIN APP CLASS
 # ==========================================
@@ -50,6 +64,10 @@ class PadSVGGeneratorApp:
         }
         self.scrap_remaining_window = None  # Popup showing progress
 
+        self._job = None  # Running background generation job, if any
+        self._preview_after = None   # Pending debounced preview (root.after id)
+        self._preview_cancel = None  # Cancel token of the preview nest in flight
+
         self.create_menus()
         self.create_widgets()
 
@@ -77,8 +95,13 @@ class PadSVGGeneratorApp:
         self.settings["card_use_paper_size"] = self.card_paper_var.get()
         dropdown_val = self.card_paper_dropdown.get().lower()
         self.settings["card_paper_size"] = "a4" if dropdown_val.startswith("a4") else "letter"
+        self.settings["roll_stock_mode"] = self.roll_mode_var.get()
+        self.settings["multi_sheet_mode"] = self.multi_sheet_var.get()
 
         save_settings(self.settings)
+        if self._job is not None:
+            self._job['cancel'].cancel()
+        shutdown_pool()
         self.root.destroy()
 
     def _get_theme_color(self):
@@ -151,8 +174,22 @@ class PadSVGGeneratorApp:
         parent = self.root
 
         tk.Label(parent, text="Enter pad sizes (e.g. 42.0x3):", bg=self.root.cget('bg')).pack(pady=5)
-        self.pad_entry = tk.Text(parent, height=10)
-        self.pad_entry.pack(fill="x", padx=10)
+        entry_frame = tk.Frame(parent, bg=self.root.cget('bg'))
+        entry_frame.pack(fill="x", padx=10)
+        self.pad_entry = tk.Text(entry_frame, height=10, width=50)
+        self.pad_entry.pack(side="left", fill="both", expand=True)
+        self.pad_entry.bind("<<Modified>>", self._on_pad_entry_modified)
+
+        # Live nesting preview for the first selected material
+        preview_frame = tk.Frame(entry_frame, bg=self.root.cget('bg'))
+        preview_frame.pack(side="left", padx=(10, 0))
+        self.preview_canvas = tk.Canvas(preview_frame, width=200, height=150, bg="white",
+                                        highlightthickness=1, highlightbackground="gray")
+        self.preview_canvas.pack()
+        self.preview_status_var = tk.StringVar(value="")
+        self.preview_status_label = tk.Label(preview_frame, textvariable=self.preview_status_var,
+                                             bg=self.root.cget('bg'), fg="gray", font=("Helvetica", 8))
+        self.preview_status_label.pack()
 
         preset_frame = tk.Frame(parent, bg=self.root.cget('bg'))
         preset_frame.pack(pady=10)
@@ -194,6 +231,7 @@ class PadSVGGeneratorApp:
                                variable=var, bg=self.root.cget('bg'))
             cb.grid(row=row, column=col, sticky='w', padx=(0, 20))
             self.material_checkboxes[m] = cb
+            var.trace_add("write", self._schedule_preview)
 
         options_frame = tk.Frame(parent, bg=self.root.cget('bg'))
         options_frame.pack(pady=10, fill='x', padx=10)
@@ -221,21 +259,24 @@ class PadSVGGeneratorApp:
         self.width_entry = tk.Entry(sheet_frame)
         self.width_entry.insert(0, self.settings["sheet_width"])
         self.width_entry.grid(row=0, column=1, sticky='w')
+        self.width_entry.bind("<KeyRelease>", self._schedule_preview)
 
         self.height_label = tk.Label(sheet_frame, text=f"Height ({self.settings['units']}):", bg=self.root.cget('bg'))
         self.height_label.grid(row=1, column=0, sticky='w', padx=5)
         self.height_entry = tk.Entry(sheet_frame)
         self.height_entry.insert(0, self.settings["sheet_height"])
         self.height_entry.grid(row=1, column=1, sticky='w')
+        self.height_entry.bind("<KeyRelease>", self._schedule_preview)
 
         # Scrap Mode checkbox and status (right side of sheet frame, centered)
         scrap_inner_frame = tk.Frame(sheet_frame, bg=self.root.cget('bg'))
         scrap_inner_frame.grid(row=0, column=2, rowspan=2, sticky='n', padx=(20, 5))
 
         self.scrap_mode_var = tk.BooleanVar(value=False)
-        tk.Checkbutton(scrap_inner_frame, text="Scrap Mode",
-                       variable=self.scrap_mode_var, bg=self.root.cget('bg'),
-                       command=self._toggle_scrap_mode).pack()
+        self.scrap_mode_cb = tk.Checkbutton(scrap_inner_frame, text="Scrap Mode",
+                                            variable=self.scrap_mode_var, bg=self.root.cget('bg'),
+                                            command=self._toggle_scrap_mode)
+        self.scrap_mode_cb.pack()
 
         # Status label (shown when session active)
         self.scrap_status_var = tk.StringVar(value="")
@@ -257,12 +298,14 @@ class PadSVGGeneratorApp:
             bg=self.root.cget('bg'), command=self._toggle_card_paper_dropdown
         )
         self.card_paper_checkbox.pack(side="left")
+        self.card_paper_var.trace_add("write", self._schedule_preview)
 
         self.card_paper_size_var = tk.StringVar(value=self.settings.get("card_paper_size", "letter"))
         self.card_paper_dropdown = ttk.Combobox(
             card_paper_frame, textvariable=self.card_paper_size_var, state="readonly", width=18,
             values=["letter (8.5x11 in)", "a4 (210x297 mm)"]
         )
+        self.card_paper_size_var.trace_add("write", self._schedule_preview)
         # Set display value based on stored setting
         if self.card_paper_size_var.get() == "a4":
             self.card_paper_dropdown.set("a4 (210x297 mm)")
@@ -285,6 +328,21 @@ class PadSVGGeneratorApp:
         # Initially hidden, shown when shape is loaded
         self._update_shape_status()
 
+        # Roll stock option (height becomes the shortest length that fits)
+        roll_frame = tk.Frame(sheet_frame, bg=self.root.cget('bg'))
+        roll_frame.grid(row=4, column=0, columnspan=3, sticky='w', pady=(8, 0))
+
+        self.roll_mode_var = tk.BooleanVar(value=self.settings.get("roll_stock_mode", False))
+        tk.Checkbutton(roll_frame, text="Roll stock (find shortest length)", variable=self.roll_mode_var,
+                       bg=self.root.cget('bg')).pack(side="left")
+        self.roll_length_var = tk.StringVar(value="")
+        tk.Label(roll_frame, textvariable=self.roll_length_var, bg=self.root.cget('bg'),
+                 fg="blue", font=("Helvetica", 9)).pack(side="left", padx=5)
+
+        self.multi_sheet_var = tk.BooleanVar(value=self.settings.get("multi_sheet_mode", False))
+        tk.Checkbutton(roll_frame, text="Multi-sheet (split across sheets)", variable=self.multi_sheet_var,
+                       bg=self.root.cget('bg')).pack(side="left", padx=(10, 0))
+
         tk.Label(parent, text="Output filename base (no extension):", bg=self.root.cget('bg')).pack(pady=5)
         self.filename_entry = tk.Entry(parent)
         self.filename_entry.insert(0, "my_pad_job")
@@ -293,8 +351,21 @@ class PadSVGGeneratorApp:
         # Two generate buttons side by side
         generate_frame = tk.Frame(parent, bg=self.root.cget('bg'))
         generate_frame.pack(pady=15)
-        tk.Button(generate_frame, text="Generate SVG", command=self.on_generate_svg, font=('Helvetica', 10, 'bold')).pack(side="left", padx=5)
-        tk.Button(generate_frame, text="Generate G-code", command=self.on_generate_gcode, font=('Helvetica', 10, 'bold')).pack(side="left", padx=5)
+        self.generate_svg_btn = tk.Button(generate_frame, text="Generate SVG", command=self.on_generate_svg, font=('Helvetica', 10, 'bold'))
+        self.generate_svg_btn.pack(side="left", padx=5)
+        self.generate_gcode_btn = tk.Button(generate_frame, text="Generate G-code", command=self.on_generate_gcode, font=('Helvetica', 10, 'bold'))
+        self.generate_gcode_btn.pack(side="left", padx=5)
+
+        # Progress bar and Cancel button (shown while a generation job runs)
+        self.job_frame = tk.Frame(parent, bg=self.root.cget('bg'))
+        self.job_progress = ttk.Progressbar(self.job_frame, length=300, maximum=1.0)
+        self.job_progress.pack(side="left", padx=5)
+        self.cancel_job_btn = tk.Button(self.job_frame, text="Cancel", command=self.on_cancel_job)
+        self.cancel_job_btn.pack(side="left", padx=5)
+        self.job_status_var = tk.StringVar(value="")
+        self.job_status_label = tk.Label(parent, textvariable=self.job_status_var, bg=self.root.cget('bg'),
+                                         fg="gray", font=("Helvetica", 9))
+        self.job_status_label.pack()
 
     def toggle_custom_hole_entry(self):
         if self.hole_var.get() == "Custom":
@@ -330,6 +401,7 @@ class PadSVGGeneratorApp:
             self.shape_status_var.set("Using rectangle dimensions")
             self.shape_status_label.config(fg="gray")
             self.unload_shape_btn.pack_forget()
+        self._schedule_preview()
 
     def _show_draw_shape_tutorial(self):
         """Show first-time tutorial for the polygon drawing tool."""
@@ -710,6 +782,333 @@ class PadSVGGeneratorApp:
             return card_paper_dims[0], card_paper_dims[1], None
         return width_mm, height_mm, self.custom_polygon
 
+    def _build_material_jobs(self, materials, params):
+        """Build one generation job per material for the worker pool."""
+        jobs = []
+        for material in materials:
+            mat_w, mat_h, mat_polygon = self._get_material_dimensions(
+                material, params['width_mm'], params['height_mm'], params['card_paper_dims'])
+            # Roll stock only applies to plain rectangular sheets
+            roll = (self.roll_mode_var.get() and mat_polygon is None
+                    and not (material == "card" and params['card_paper_dims']))
+            jobs.append({
+                'material': material, 'pads': params['pads'],
+                'width_mm': mat_w, 'height_mm': mat_h, 'polygon': mat_polygon,
+                'settings': dict(self.settings), 'roll': roll,
+                'multi_sheet': self.multi_sheet_var.get() and not roll
+            })
+        return jobs
+
+    def _apply_roll_lengths(self, jobs, fit_results):
+        """Use each roll-mode material's shortest length as its height and show it in the UI."""
+        lengths = []
+        for job in jobs:
+            if job['roll']:
+                job['height_mm'] = fit_results[job['material']]['height_mm']
+                lengths.append(f"{job['material'].replace('_', ' ')} {job['height_mm']:.0f}mm")
+        self.roll_length_var.set("Length: " + ", ".join(lengths) if lengths else "")
+
+    def _sheet_summary(self, jobs):
+        """One line per multi-sheet material, e.g. 'felt: 3 sheets'."""
+        return "\n".join(f"{job['material'].replace('_', ' ')}: {len(job['sheets'])} sheets"
+                         for job in jobs if job.get('sheets'))
+
+    def _check_fit_results(self, fit_results, card_paper_dims):
+        """Report failed or non-fitting materials. Returns True if every material fits."""
+        errors = [f"{m.replace('_',' ')}: {r['error']}" for m, r in fit_results.items() if r['error']]
+        if errors:
+            messagebox.showerror("An Error Occurred", "Nesting failed for:\n\n" + "\n".join(errors))
+            return False
+        for material, result in fit_results.items():
+            if result.get('timed_out'):
+                messagebox.showerror(
+                    "Nesting Timed Out",
+                    f"Nesting '{material.replace('_',' ')}' hit the effort level's time limit before every piece "
+                    "was placed, so it is not known whether they fit.\n\n"
+                    "Try again with a higher effort level (Options > Nesting Effort).")
+                return False
+            if not result['fits']:
+                size_desc = "paper" if (material == "card" and card_paper_dims) else "sheet"
+                msg = f"Could not fit all '{material.replace('_',' ')}' pieces on the specified {size_desc} size."
+                if result.get('reason'):
+                    msg += f"\n\n{result['reason']}"
+                messagebox.showerror("Nesting Error", msg)
+                return False
+        return True
+
+    def _check_write_results(self, write_results):
+        """Report materials whose files could not be written. Returns True if all succeeded."""
+        errors = [f"{m.replace('_',' ')}: {r['error']}" for m, r in write_results.items() if r['error']]
+        if errors:
+            written = [os.path.basename(f) for r in write_results.values() if not r['error'] for f in r['filenames']]
+            msg = "Could not write files for:\n\n" + "\n".join(errors)
+            if written:
+                msg += "\n\nWritten: " + ", ".join(written)
+            messagebox.showerror("An Error Occurred", msg)
+            return False
+        return True
+
+    # --- Live Preview ---
+
+    def _on_pad_entry_modified(self, event=None):
+        """Text widgets only fire <<Modified>> once until the flag is reset."""
+        self.pad_entry.edit_modified(False)
+        self._schedule_preview()
+
+    def _schedule_preview(self, *args):
+        """Redraw the preview PREVIEW_DELAY_MS after the last change (restarting the wait on each change)."""
+        if self._preview_after is not None:
+            self.root.after_cancel(self._preview_after)
+        self._preview_after = self.root.after(PREVIEW_DELAY_MS, self._start_preview)
+
+    def _preview_inputs(self):
+        """(pads, material, width_mm, height_mm, polygon) for the preview, or None while the input is incomplete."""
+        pads = self.parse_pad_list(self.pad_entry.get("1.0", tk.END))
+        materials = [m for m, var in self.material_vars.items() if var.get()]
+        if not pads or not materials:
+            return None
+        try:
+            width_val = float(self.width_entry.get())
+            height_val = float(self.height_entry.get())
+        except ValueError:
+            return None
+        scale = {'in': 25.4, 'cm': 10, 'mm': 1}.get(self.settings['units'])
+        if scale is None or width_val <= 0 or height_val <= 0:
+            return None
+        material = materials[0]
+        mat_w, mat_h, mat_polygon = self._get_material_dimensions(
+            material, width_val * scale, height_val * scale, self._get_card_paper_dimensions_mm())
+        return pads, material, mat_w, mat_h, mat_polygon
+
+    def _start_preview(self):
+        """Nest the current input with the fast effort level on a worker thread."""
+        self._preview_after = None
+        if self._preview_cancel is not None:
+            # Newer input supersedes the preview still being nested
+            self._preview_cancel.cancel()
+            self._preview_cancel = None
+
+        inputs = self._preview_inputs()
+        if inputs is None:
+            self.preview_canvas.delete("all")
+            self.preview_status_var.set("")
+            return
+        pads, material, mat_w, mat_h, mat_polygon = inputs
+
+        cancel = CancelToken()
+        self._preview_cancel = cancel
+        results = queue.Queue()
+        settings = dict(self.settings, effort="fast", compaction=False)
+
+        def target():
+            try:
+                results.put(nest_discs_cached(pads, material, mat_w, mat_h, settings,
+                                              polygon=mat_polygon, cancel=cancel))
+            except Exception as e:
+                results.put(e)
+
+        threading.Thread(target=target, daemon=True).start()
+        self.preview_status_var.set("Nesting...")
+        self.preview_status_label.config(fg="gray")
+        self.root.after(JOB_POLL_MS, self._poll_preview, cancel, results, inputs)
+
+    def _poll_preview(self, cancel, results, inputs):
+        """Draw the preview once its nest finishes, unless newer input made it stale."""
+        if cancel.is_set():
+            return
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            self.root.after(JOB_POLL_MS, self._poll_preview, cancel, results, inputs)
+            return
+        self._preview_cancel = None
+        if isinstance(result, Exception):
+            print(f"Preview failed: {result}")
+            self.preview_canvas.delete("all")
+            self.preview_status_var.set("Preview unavailable")
+            return
+        self._draw_preview(inputs, result)
+
+    def _draw_preview(self, inputs, result):
+        """Draw the sheet outline and nested discs scaled to fit the preview canvas."""
+        _, material, mat_w, mat_h, mat_polygon = inputs
+        placed, fixed_placed, fixed_total = result
+        canvas = self.preview_canvas
+        canvas.delete("all")
+
+        if mat_polygon:
+            mat_w = max(x for x, _ in mat_polygon)
+            mat_h = max(y for _, y in mat_polygon)
+        avail_w = int(canvas.cget('width')) - 2 * PREVIEW_MARGIN_PX
+        avail_h = int(canvas.cget('height')) - 2 * PREVIEW_MARGIN_PX
+        scale = min(avail_w / mat_w, avail_h / mat_h)
+
+        def to_canvas(x, y):
+            return PREVIEW_MARGIN_PX + x * scale, PREVIEW_MARGIN_PX + y * scale
+
+        if mat_polygon:
+            points = [c for x, y in mat_polygon for c in to_canvas(x, y)]
+            canvas.create_polygon(points, outline="gray", fill="")
+        else:
+            canvas.create_rectangle(*to_canvas(0, 0), *to_canvas(mat_w, mat_h), outline="gray")
+        for _, cx, cy, r in placed:
+            canvas.create_oval(*to_canvas(cx - r, cy - r), *to_canvas(cx + r, cy + r), outline="blue")
+
+        status = f"{material.replace('_', ' ')}: {fixed_placed}/{fixed_total} pads fit"
+        if len(placed) > fixed_placed:
+            status += f" (+{len(placed) - fixed_placed} max)"
+        self.preview_status_var.set(status)
+        self.preview_status_label.config(fg="gray" if fixed_placed == fixed_total else "red")
+
+    # --- Background Generation ---
+
+    def _run_in_background(self, status, work, on_done, parts=1, cancellable=True):
+        """
+        Run work(progress, cancel) on a worker thread so the window stays responsive.
+
+        Nest progress reports and the result come back through a queue polled
+        with root.after; on_done(result) then runs on the Tk thread. work
+        returns None when it stopped because of cancel, and nothing is done
+        then; once it has gone past its last cancel check (e.g. files written)
+        it returns its result and on_done runs even if Cancel was pressed late.
+        parts is how many materials report progress (the bar shows their
+        average). Jobs that are not cancellable keep the Cancel button disabled.
+        """
+        job = {'cancel': CancelToken(), 'queue': queue.Queue(), 'parts': parts, 'fractions': {}}
+        self._job = job
+        self._set_generating(True, status, cancellable)
+
+        def target():
+            try:
+                result = work(lambda info: job['queue'].put(('progress', info)), job['cancel'])
+                job['queue'].put(('done', result))
+            except Exception as e:
+                job['queue'].put(('error', e))
+
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(JOB_POLL_MS, self._poll_background, job, on_done)
+
+    def _poll_background(self, job, on_done):
+        """Apply queued progress reports; hand the result to on_done once the worker finishes."""
+        while True:
+            try:
+                kind, payload = job['queue'].get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self._show_job_progress(job, payload)
+                continue
+
+            self._job = None
+            self._set_generating(False)
+            try:
+                if kind == 'error':
+                    raise payload
+                if payload is None:
+                    self.job_status_var.set("Cancelled.")
+                else:
+                    on_done(payload)
+            except Exception as e:
+                print(f"An error occurred during generation: {e}")
+                messagebox.showerror("An Error Occurred", f"Something went wrong during generation:\n\n{e}")
+            return
+        self.root.after(JOB_POLL_MS, self._poll_background, job, on_done)
+
+    def _show_job_progress(self, job, info):
+        """Update the progress bar and status line from one nest progress report."""
+        if info['phase'] == 'done':
+            fraction = 1.0
+        elif info['fixed_total']:
+            fraction = info['fixed_done'] / info['fixed_total']
+        else:
+            fraction = 0.0
+        material = info.get('material')
+        job['fractions'][material] = max(fraction, job['fractions'].get(material, 0.0))
+
+        if str(self.job_progress.cget('mode')) == 'indeterminate':
+            self.job_progress.stop()
+            self.job_progress.config(mode='determinate')
+        self.job_progress['value'] = sum(job['fractions'].values()) / job['parts']
+
+        status = f"{info['placed']} pads placed"
+        if material:
+            status = f"{material.replace('_', ' ')}: {status}"
+        if info['eta']:
+            status += f" (about {info['eta']:.0f}s left)"
+        if not job['cancel'].is_set():
+            self.job_status_var.set(status)
+
+    def _set_generating(self, busy, status="", cancellable=True):
+        """Show or hide the progress bar and Cancel button, locking the controls that start another job."""
+        state = "disabled" if busy else "normal"
+        for widget in (self.generate_svg_btn, self.generate_gcode_btn, self.scrap_mode_cb, self.clear_scrap_btn):
+            widget.config(state=state)
+        if busy:
+            # Indeterminate until the first nest progress report arrives
+            self.job_progress.config(mode='indeterminate', value=0)
+            self.job_progress.start(20)
+            self.cancel_job_btn.config(state="normal" if cancellable else "disabled")
+            self.job_frame.pack(pady=(0, 5), before=self.job_status_label)
+        else:
+            self.job_progress.stop()
+            self.job_frame.pack_forget()
+        self.job_status_var.set(status)
+
+    def on_cancel_job(self):
+        """Ask the running generation job to stop; nesting stops at its next checkpoint."""
+        if self._job is not None:
+            self._job['cancel'].cancel()
+            self.cancel_job_btn.config(state="disabled")
+            self.job_status_var.set("Cancelling...")
+
+    def _generate_material_files(self, materials, params, output):
+        """
+        Standard-mode generation: nest every material in the background, ask
+        where to save once they all fit, then write the files in the background.
+        """
+        hole_dia, base = params['hole_dia'], params['base']
+        card_paper_dims = params['card_paper_dims']
+        label = "SVG" if output == "svg" else "G-code"
+
+        # Validate all materials fit (one job per material, run in parallel)
+        jobs = self._build_material_jobs(materials, params)
+
+        def fit(progress, cancel):
+            results = run_material_jobs(fit_material_job, jobs, progress=progress, cancel=cancel)
+            return None if cancel.is_set() else results
+
+        def write(progress, cancel):
+            # Not cancellable: stopping half way would leave some files written and others not
+            return run_material_jobs(write_material_job, jobs)
+
+        def on_fitted(fit_results):
+            if not self._check_fit_results(fit_results, card_paper_dims):
+                return
+            self._apply_roll_lengths(jobs, fit_results)
+
+            title = "Select Folder to Save SVGs" if output == "svg" else "Select Folder to Save G-code"
+            save_dir = filedialog.askdirectory(title=title, initialdir=self.settings.get("last_output_dir", ""))
+            if not save_dir:
+                return
+            self.settings["last_output_dir"] = save_dir
+
+            for job in jobs:
+                job['placed'] = fit_results[job['material']]['placed']
+                job['sheets'] = fit_results[job['material']]['sheets']
+                job['filenames'] = output_filenames(save_dir, base, job, output)
+                job['hole_dia'] = hole_dia
+                job['output'] = output
+            self._run_in_background(f"Writing {label} files...", write, on_written, cancellable=False)
+
+        def on_written(write_results):
+            if not self._check_write_results(write_results):
+                return
+            save_settings(self.settings)
+            summary = self._sheet_summary(jobs)
+            messagebox.showinfo("Done", f"{label} files generated successfully." + (f"\n\n{summary}" if summary else ""))
+
+        self._run_in_background("Nesting...", fit, on_fitted, parts=len(jobs))
+
     def on_generate_svg(self):
         """Generate SVG files."""
         # --- Scrap Mode ---
@@ -723,37 +1122,12 @@ class PadSVGGeneratorApp:
             if not params:
                 return
 
-            pads, hole_dia, base = params['pads'], params['hole_dia'], params['base']
-            width_mm, height_mm = params['width_mm'], params['height_mm']
-            card_paper_dims = params['card_paper_dims']
-
-            # Validate all materials fit
-            for material, var in self.material_vars.items():
-                if var.get():
-                    mat_w, mat_h, mat_polygon = self._get_material_dimensions(material, width_mm, height_mm, card_paper_dims)
-                    if not can_all_pads_fit(pads, material, mat_w, mat_h, self.settings, polygon=mat_polygon):
-                        size_desc = "paper" if (material == "card" and card_paper_dims) else "sheet"
-                        messagebox.showerror("Nesting Error", f"Could not fit all '{material.replace('_',' ')}' pieces on the specified {size_desc} size.")
-                        return
-
-            save_dir = filedialog.askdirectory(title="Select Folder to Save SVGs", initialdir=self.settings.get("last_output_dir", ""))
-            if not save_dir:
+            selected_materials = [m for m, var in self.material_vars.items() if var.get()]
+            if not selected_materials:
+                messagebox.showwarning("No Materials Selected", "Please select at least one material.")
                 return
-            self.settings["last_output_dir"] = save_dir
 
-            files_generated = False
-            for material, var in self.material_vars.items():
-                if var.get():
-                    mat_w, mat_h, mat_polygon = self._get_material_dimensions(material, width_mm, height_mm, card_paper_dims)
-                    filename = os.path.join(save_dir, f"{base}_{material}.svg")
-                    generate_svg(pads, material, mat_w, mat_h, filename, hole_dia, self.settings, polygon=mat_polygon)
-                    files_generated = True
-
-            if files_generated:
-                save_settings(self.settings)
-                messagebox.showinfo("Done", "SVG files generated successfully.")
-            else:
-                messagebox.showwarning("No Materials Selected", "Please select at least one material.")
+            self._generate_material_files(selected_materials, params, "svg")
 
         except Exception as e:
             print(f"An error occurred during SVG generation: {e}")
@@ -810,48 +1184,25 @@ class PadSVGGeneratorApp:
                 messagebox.showinfo("Session Complete", "All pads have been placed!")
                 return
 
-            # Attempt partial placement
-            placed, remaining, any_placed = try_nest_partial(
-                pads, material, mat_w, mat_h, self.settings, polygon=mat_polygon)
-
-            if not any_placed:
-                min_pad_size = min(p['size'] for p in pads)
-                messagebox.showwarning("No Pads Fit",
-                    f"No pads could be placed on this scrap.\n\n"
-                    f"Smallest remaining pad: {min_pad_size}mm\n"
-                    f"Try a larger scrap piece.")
-                return
-
-            # Generate filename with scrap number
-            self.scrap_session['scrap_count'] += 1
-            scrap_num = self.scrap_session['scrap_count']
+            # Attempt partial placement and write the scrap file in the background
+            scrap_num = self.scrap_session['scrap_count'] + 1
             save_dir = self.scrap_session['save_dir']
             filename = os.path.join(save_dir, f"{base}_{material}_scrap{scrap_num}.svg")
-
-            # Generate SVG from placed discs
-            generate_svg_from_placed(placed, material, mat_w, mat_h, filename,
-                                     hole_dia, self.settings, polygon=mat_polygon)
-
-            # Update session with remaining pads
-            self.scrap_session['remaining_pads'] = remaining
-            self._update_scrap_status_display()
-            self._update_remaining_pads_window()
-
-            # Report results
-            placed_count = len(placed)
-            remaining_count = self._count_remaining_pads()
-
-            if remaining_count == 0:
-                save_settings(self.settings)
-                messagebox.showinfo("Session Complete!",
-                    f"Placed {placed_count} pads on scrap #{scrap_num}.\n\n"
-                    f"All pads placed! Session complete.\n"
-                    f"Files saved to: {save_dir}")
-            else:
-                messagebox.showinfo("Scrap Generated",
-                    f"Placed {placed_count} pads on scrap #{scrap_num}.\n\n"
-                    f"{remaining_count} pads remaining.\n"
-                    f"Adjust dimensions and click Generate again.")
+            settings = dict(self.settings)
+
+            def work(progress, cancel):
+                placed, remaining, any_placed = try_nest_partial(
+                    pads, material, mat_w, mat_h, settings, polygon=mat_polygon,
+                    progress=progress, cancel=cancel)
+                if cancel.is_set():
+                    return None  # Cancelled before anything was written
+                if any_placed:
+                    generate_svg_from_placed(placed, material, mat_w, mat_h, filename,
+                                             hole_dia, settings, polygon=mat_polygon)
+                return placed, remaining, any_placed
+
+            self._run_in_background("Nesting scrap...", work,
+                                    lambda result: self._finish_scrap(result, pads, scrap_num))
 
         except Exception as e:
             print(f"An error occurred during scrap mode SVG generation: {e}")
@@ -870,54 +1221,13 @@ class PadSVGGeneratorApp:
             if not params:
                 return
 
-            pads, hole_dia, base = params['pads'], params['hole_dia'], params['base']
-            width_mm, height_mm = params['width_mm'], params['height_mm']
-            card_paper_dims = params['card_paper_dims']
-
             # Check if any supported materials selected (not exact_size)
             supported_materials = [m for m, var in self.material_vars.items() if var.get() and m != "exact_size"]
             if not supported_materials:
                 messagebox.showwarning("No Materials Selected", "Please select at least one material (G-code not supported for Exact Size).")
                 return
 
-            # Validate all materials fit
-            for material in supported_materials:
-                mat_w, mat_h, mat_polygon = self._get_material_dimensions(material, width_mm, height_mm, card_paper_dims)
-                if not can_all_pads_fit(pads, material, mat_w, mat_h, self.settings, polygon=mat_polygon):
-                    size_desc = "paper" if (material == "card" and card_paper_dims) else "sheet"
-                    messagebox.showerror("Nesting Error", f"Could not fit all '{material.replace('_',' ')}' pieces on the specified {size_desc} size.")
-                    return
-
-            save_dir = filedialog.askdirectory(title="Select Folder to Save G-code", initialdir=self.settings.get("last_output_dir", ""))
-            if not save_dir:
-                return
-            self.settings["last_output_dir"] = save_dir
-
-            # Show working indicator
-            working_popup = tk.Toplevel(self.root)
-            working_popup.title("Working")
-            working_popup.geometry("250x80")
-            popup_bg = self._get_theme_color()
-            working_popup.configure(bg=popup_bg)
-            working_popup.transient(self.root)
-            working_popup.resizable(False, False)
-            working_popup.update_idletasks()
-            x = self.root.winfo_x() + (self.root.winfo_width() // 2) - 125
-            y = self.root.winfo_y() + (self.root.winfo_height() // 2) - 40
-            working_popup.geometry(f"+{x}+{y}")
-            tk.Label(working_popup, text="Generating G-code...", bg=popup_bg, font=("Helvetica", 12)).pack(expand=True)
-            working_popup.update()
-
-            try:
-                for material in supported_materials:
-                    mat_w, mat_h, mat_polygon = self._get_material_dimensions(material, width_mm, height_mm, card_paper_dims)
-                    filename = os.path.join(save_dir, f"{base}_{material}.gcode")
-                    generate_gcode(pads, material, mat_w, mat_h, filename, hole_dia, self.settings, polygon=mat_polygon)
-            finally:
-                working_popup.destroy()
-
-            save_settings(self.settings)
-            messagebox.showinfo("Done", "G-code files generated successfully.")
+            self._generate_material_files(supported_materials, params, "gcode")
 
         except Exception as e:
             print(f"An error occurred during G-code generation: {e}")
@@ -975,80 +1285,66 @@ class PadSVGGeneratorApp:
                 messagebox.showinfo("Session Complete", "All pads have been placed!")
                 return
 
-            # Attempt partial placement
-            placed, remaining, any_placed = try_nest_partial(
-                pads, material, mat_w, mat_h, self.settings, polygon=mat_polygon)
-
-            if not any_placed:
-                min_pad_size = min(p['size'] for p in pads)
-                messagebox.showwarning("No Pads Fit",
-                    f"No pads could be placed on this scrap.\n\n"
-                    f"Smallest remaining pad: {min_pad_size}mm\n"
-                    f"Try a larger scrap piece.")
-                return
-
-            # Generate filename with scrap number
-            self.scrap_session['scrap_count'] += 1
-            scrap_num = self.scrap_session['scrap_count']
+            # Attempt partial placement and write the scrap file in the background
+            scrap_num = self.scrap_session['scrap_count'] + 1
             save_dir = self.scrap_session['save_dir']
             filename = os.path.join(save_dir, f"{base}_{material}_scrap{scrap_num}.gcode")
-
-            # Generate G-code from placed discs
-            generate_gcode_from_placed(placed, material, mat_w, mat_h, filename,
-                                       hole_dia, self.settings, polygon=mat_polygon)
-
-            # Update session with remaining pads
-            self.scrap_session['remaining_pads'] = remaining
-            self._update_scrap_status_display()
-            self._update_remaining_pads_window()
-
-            # Report results
-            placed_count = len(placed)
-            remaining_count = self._count_remaining_pads()
-
-            if remaining_count == 0:
-                save_settings(self.settings)
-                messagebox.showinfo("Session Complete!",
-                    f"Placed {placed_count} pads on scrap #{scrap_num}.\n\n"
-                    f"All pads placed! Session complete.\n"
-                    f"Files saved to: {save_dir}")
-            else:
-                messagebox.showinfo("Scrap Generated",
-                    f"Placed {placed_count} pads on scrap #{scrap_num}.\n\n"
-                    f"{remaining_count} pads remaining.\n"
-                    f"Adjust dimensions and click Generate again.")
+            settings = dict(self.settings)
+
+            def work(progress, cancel):
+                placed, remaining, any_placed = try_nest_partial(
+                    pads, material, mat_w, mat_h, settings, polygon=mat_polygon,
+                    progress=progress, cancel=cancel)
+                if cancel.is_set():
+                    return None  # Cancelled before anything was written
+                if any_placed:
+                    generate_gcode_from_placed(placed, material, mat_w, mat_h, filename,
+                                               hole_dia, settings, polygon=mat_polygon)
+                return placed, remaining, any_placed
+
+            self._run_in_background("Nesting scrap...", work,
+                                    lambda result: self._finish_scrap(result, pads, scrap_num))
 
         except Exception as e:
             print(f"An error occurred during scrap mode G-code generation: {e}")
             messagebox.showerror("An Error Occurred", f"Something went wrong:\n\n{e}")
 
+    def _finish_scrap(self, result, pads, scrap_num):
+        """Record a finished scrap nest in the session and report it."""
+        placed, remaining, any_placed = result
+        if not any_placed:
+            min_pad_size = min(p['size'] for p in pads)
+            messagebox.showwarning("No Pads Fit",
+                f"No pads could be placed on this scrap.\n\n"
+                f"Smallest remaining pad: {min_pad_size}mm\n"
+                f"Try a larger scrap piece.")
+            return
+
+        # Update session with the new scrap and remaining pads
+        self.scrap_session['scrap_count'] = scrap_num
+        self.scrap_session['remaining_pads'] = remaining
+        self._update_scrap_status_display()
+        self._update_remaining_pads_window()
+
+        # Report results
+        placed_count = len(placed)
+        remaining_count = self._count_remaining_pads()
+        save_dir = self.scrap_session['save_dir']
+
+        if remaining_count == 0:
+            save_settings(self.settings)
+            messagebox.showinfo("Session Complete!",
+                f"Placed {placed_count} pads on scrap #{scrap_num}.\n\n"
+                f"All pads placed! Session complete.\n"
+                f"Files saved to: {save_dir}")
+        else:
+            messagebox.showinfo("Scrap Generated",
+                f"Placed {placed_count} pads on scrap #{scrap_num}.\n\n"
+                f"{remaining_count} pads remaining.\n"
+                f"Adjust dimensions and click Generate again.")
+
     def parse_pad_list(self, pad_input):
-        """
-        Parse pad input. Supports:
-        - Regular: "18.0 x 5" (size x quantity)
-        - Max fill: "18.0 x max" (fill remaining space with this size)
-        Only one pad size can use "max" at a time.
-        """
-        pad_list = []
-        for line in pad_input.strip().splitlines():
-            line = line.strip().lower()
-            if not line:
-                continue
-            try:
-                parts = line.split('x', 1)  # Split only on first 'x' (so 'max' doesn't get split)
-                if len(parts) != 2:
-                    continue
-                size = float(parts[0].strip())
-                if size <= 0:
-                    continue
-                qty_str = parts[1].strip()
-                if qty_str == 'max':
-                    pad_list.append({'size': size, 'qty': 'max'})
-                else:
-                    pad_list.append({'size': size, 'qty': int(float(qty_str))})
-            except ValueError:
-                continue
-        return pad_list
+        return parse_pad_list(pad_input)
 
     # --- Pad Presets Wrappers ---
 
@@ -1351,6 +1647,7 @@ $driveEject.Namespace(17).ParseName("{drive_letter}").InvokeVerb("Eject")
     def update_ui_from_settings(self):
         self.unit_label.config(text=f"Width ({self.settings['units']}):")
         self.height_label.config(text=f"Height ({self.settings['units']}):")
+        self._schedule_preview()
 
 
 # ==========================================
@@ -1419,6 +1716,7 @@ class ImportTargetWindow(tk.Toplevel):
 
 
 if __name__ == '__main__':
+    freeze_support()
     root = tk.Tk()
     app = PadSVGGeneratorApp(root)
     root.mainloop()
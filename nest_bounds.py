@@ -0,0 +1,162 @@
+"""
+Cheap feasibility bounds for Stohrer Sax Pad SVG Generator nesting.
+
+Every test here is a necessary condition for a layout to exist under the
+nesting rules (each disc at least spacing_mm from the sheet edge and from
+every other disc). A failed test means the job is certainly impossible; a
+passed test only means a real nest is needed to decide.
+"""
+
+import math
+from functools import lru_cache
+
+IMPOSSIBLE = "impossible"
+NEEDS_NEST = "needs_nest"
+
+# Slack so discs that fit exactly (e.g. tangent engine contacts) are never rejected
+BOUNDS_TOLERANCE = 1e-6
+
+
+def _oler_bound(area, half_perimeter, min_dist):
+    """
+    Oler's inequality: at most (2/sqrt(3))*A/d^2 + (P/2)/d + 1 points with
+    mutual distance >= d fit in a convex region of area A and perimeter P.
+    """
+    return (2 / math.sqrt(3)) * area / (min_dist * min_dist) + half_perimeter / min_dist + 1
+
+
+def _polygon_area_perimeter(polygon):
+    """Absolute shoelace area and perimeter of a polygon."""
+    area = 0.0
+    perimeter = 0.0
+    n = len(polygon)
+    for i in range(n):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % n]
+        area += x1 * y2 - x2 * y1
+        perimeter += math.hypot(x2 - x1, y2 - y1)
+    return abs(area) / 2, perimeter
+
+
+def polygon_area(polygon):
+    """Absolute area of a polygon given as (x, y) points, e.g. a sheet outline in mm^2."""
+    return _polygon_area_perimeter(polygon)[0]
+
+
+def _polygon_is_convex(polygon):
+    """True if every turn along the polygon has the same orientation."""
+    n = len(polygon)
+    sign = 0
+    for i in range(n):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % n]
+        x3, y3 = polygon[(i + 2) % n]
+        cross = (x2 - x1) * (y3 - y2) - (y2 - y1) * (x3 - x2)
+        if cross:
+            if sign and (cross > 0) != (sign > 0):
+                return False
+            sign = cross
+    return True
+
+
+@lru_cache(maxsize=16)
+def _polygon_inradius_bound(polygon):
+    """
+    Upper bound on the radius of the largest circle inside the polygon.
+
+    Samples edge distance on a 17x17 grid. Distance to the boundary is
+    1-Lipschitz, so the true inradius is at most the best sample plus half
+    the grid diagonal (and never more than half the bounding box).
+    """
+    from svg_engine import _point_in_polygon, _distance_to_nearest_edge
+
+    xs = [p[0] for p in polygon]
+    ys = [p[1] for p in polygon]
+    box_w, box_h = max(xs) - min(xs), max(ys) - min(ys)
+    step = max(box_w, box_h) / 16
+    if step <= 0:
+        return 0.0
+
+    best = 0.0
+    for i in range(17):
+        for j in range(17):
+            x, y = min(xs) + i * step, min(ys) + j * step
+            if _point_in_polygon(x, y, polygon):
+                best = max(best, _distance_to_nearest_edge(x, y, polygon))
+    return min(best + step * math.sqrt(2) / 2, min(box_w, box_h) / 2)
+
+
+def check_fit_bounds(diameters, width_mm, height_mm, spacing_mm=1.0, polygon=None):
+    """
+    Decide from cheap bounds whether discs of the given diameters could fit.
+
+    Args:
+        diameters: disc diameters (mm) of every fixed-quantity disc to place
+        width_mm, height_mm: rectangular sheet size (ignored when polygon is given)
+        polygon: optional list of (x, y) tuples in mm
+
+    Returns:
+        (IMPOSSIBLE, reason) when no layout can exist,
+        (NEEDS_NEST, None) when only a real nest can tell.
+    """
+    if not diameters:
+        return NEEDS_NEST, None
+
+    s = spacing_mm
+    tol = BOUNDS_TOLERANCE
+    largest = max(diameters)
+
+    # Inflating each disc by half the spacing makes the inflated discs disjoint;
+    # they must lie inside the sheet shrunk by half the spacing on every side.
+    disc_area = sum(math.pi * (d / 2 + s / 2) ** 2 for d in diameters)
+
+    if polygon:
+        polygon = tuple((float(x), float(y)) for x, y in polygon)
+        inradius = _polygon_inradius_bound(polygon)
+        if largest / 2 + s > inradius + tol:
+            return IMPOSSIBLE, f"A {largest:.1f}mm disc is larger than the widest part of the shape."
+
+        area, perimeter = _polygon_area_perimeter(polygon)
+        if disc_area > area + tol:
+            return IMPOSSIBLE, f"The discs need at least {disc_area:.0f}mm² but the shape is only {area:.0f}mm²."
+
+        if _polygon_is_convex(polygon):
+            # Every center lies inside the (convex) shape, so Oler bounds the count
+            for d in sorted(set(diameters), reverse=True):
+                count = sum(1 for x in diameters if x >= d)
+                if count > _oler_bound(area, perimeter / 2, d + s) + tol:
+                    return IMPOSSIBLE, f"At most {int(_oler_bound(area, perimeter / 2, d + s))} discs of {d:.1f}mm or larger fit in the shape ({count} needed)."
+        return NEEDS_NEST, None
+
+    if largest + 2 * s > min(width_mm, height_mm) + tol:
+        return IMPOSSIBLE, f"A {largest:.1f}mm disc does not fit within the {width_mm:.0f} x {height_mm:.0f}mm sheet."
+
+    usable = (width_mm - s) * (height_mm - s)
+    if disc_area > usable + tol:
+        return IMPOSSIBLE, f"The discs need at least {disc_area:.0f}mm² but the sheet has only {usable:.0f}mm²."
+
+    # Counting bound per diameter class: discs of diameter >= d keep their
+    # centers >= d + spacing apart, inside the box left for a d-sized disc.
+    for d in sorted(set(diameters), reverse=True):
+        count = sum(1 for x in diameters if x >= d)
+        box_w = max(width_mm - 2 * s - d, 0.0)
+        box_h = max(height_mm - 2 * s - d, 0.0)
+        limit = _oler_bound(box_w * box_h, box_w + box_h, d + s)
+        if count > limit + tol:
+            return IMPOSSIBLE, f"At most {int(limit)} discs of {d:.1f}mm or larger fit on the sheet ({count} needed)."
+
+    return NEEDS_NEST, None
+
+
+def min_sheet_count(diameters, width_mm, height_mm, spacing_mm=1.0, polygon=None):
+    """Fewest sheets the discs could possibly need, from total (inflated) disc area."""
+    if not diameters:
+        return 0
+    disc_area = sum(math.pi * (d / 2 + spacing_mm / 2) ** 2 for d in diameters)
+    if polygon:
+        usable = polygon_area(polygon)
+    else:
+        usable = (width_mm - spacing_mm) * (height_mm - spacing_mm)
+    if usable <= 0:
+        return len(diameters)
+    return max(1, math.ceil(disc_area / usable - BOUNDS_TOLERANCE))
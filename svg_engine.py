@@ -1,6 +1,23 @@
+import bisect
 import math
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
 import svgwrite
 from config import DEFAULT_SETTINGS
+from nest_bounds import check_fit_bounds, min_sheet_count, IMPOSSIBLE
+
+try:
+    import numpy as np
+except ImportError:  # Optional (requirements-optional.txt) - the "numpy" engine needs it, shape nesting is faster with it
+    np = None
+
+# Whether the "numpy" nesting engine can run (otherwise it falls back to "raster")
+HAVE_NUMPY = np is not None
 
 # ==========================================
 # CORE MATH & LOGIC
@@ -111,23 +128,14 @@ def check_for_oversized_engravings(pads, material_vars, settings):
             oversized[material] = oversized_sizes
     return oversized
 
-def _nest_discs(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None):
+def _expand_pads(pads, material, settings):
     """
-    Greedy circle-packing algorithm. Returns list of placed discs as (pad_size, cx, cy, r).
-    Discs that couldn't be placed are omitted from the result.
-
-    If polygon is provided (list of (x,y) tuples in mm), uses polygon nesting instead of rectangle.
-
-    Supports 'max' quantity: fixed-qty pads are placed first, then max pads fill remaining space.
+    Split a pad list into the fixed discs to place and the optional 'max' pad.
+    Returns (discs, max_pad) where discs is [(pad_size, diameter), ...] sorted largest first.
     """
-    if polygon:
-        return _nest_discs_polygon(pads, material, settings, polygon, spacing_mm)
-
-    # Separate fixed and max pads
     fixed_pads = [p for p in pads if p['qty'] != 'max']
     max_pads = [p for p in pads if p['qty'] == 'max']
 
-    # Build disc list from fixed pads
     discs = []
     for pad in fixed_pads:
         pad_size, qty = pad['size'], pad['qty']
@@ -135,52 +143,982 @@ def _nest_discs(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, p
         for _ in range(qty):
             discs.append((pad_size, diameter))
 
-    discs.sort(key=lambda x: -x[1])  # Largest first
+    seed = settings.get("nest_seed")
+    if seed:
+        # Multi-start trial: largest first on jittered diameters, so close sizes swap places
+        rng = random.Random(seed)
+        discs.sort(key=lambda x: -x[1] * (1 + rng.uniform(0.0, MULTISTART_JITTER)))
+    else:
+        discs.sort(key=lambda x: -x[1])  # Largest first
+    return discs, (max_pads[0] if max_pads else None)
+
+
+# ==========================================
+# SPATIAL INDEX
+# ==========================================
+
+class _DiscIndex:
+    """
+    Uniform-grid bucket index of placed discs.
+
+    Cell size should be about the largest disc diameter, so a collision test
+    only has to look at the handful of cells around the candidate center
+    instead of every disc on the sheet.
+    """
+
+    def __init__(self, cell_size, spacing_mm=1.0):
+        self.cell = max(float(cell_size), 1.0)
+        self.spacing = spacing_mm
+        self.buckets = {}
+        self.max_r = 0.0
+
+    def _cell_of(self, x, y):
+        return int(math.floor(x / self.cell)), int(math.floor(y / self.cell))
+
+    def add(self, pad_size, cx, cy, r):
+        key = self._cell_of(cx, cy)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = []
+        bucket.append((pad_size, cx, cy, r))
+        if r > self.max_r:
+            self.max_r = r
+
+    def remove(self, pad_size, cx, cy, r):
+        """Drop a previously added disc (max_r stays an upper bound)."""
+        self.buckets[self._cell_of(cx, cy)].remove((pad_size, cx, cy, r))
+
+    def near(self, cx, cy, reach):
+        """Yield placed discs from every cell within `reach` mm of (cx, cy)."""
+        if not self.buckets:
+            return
+        x0, y0 = self._cell_of(cx - reach, cy - reach)
+        x1, y1 = self._cell_of(cx + reach, cy + reach)
+        buckets = self.buckets
+        for gx in range(x0, x1 + 1):
+            for gy in range(y0, y1 + 1):
+                bucket = buckets.get((gx, gy))
+                if bucket:
+                    yield from bucket
+
+    def collides(self, cx, cy, r, tolerance=0.0):
+        """
+        True if a disc of radius r at (cx, cy) is closer than spacing to any placed disc.
+        tolerance lets analytically tangent positions count as touching, not overlapping.
+        """
+        buckets = self.buckets
+        if not buckets:
+            return False
+        spacing = self.spacing - tolerance
+        cell = self.cell
+        reach = r + self.max_r + self.spacing
+        gx0 = int(math.floor((cx - reach) / cell))
+        gx1 = int(math.floor((cx + reach) / cell))
+        gy0 = int(math.floor((cy - reach) / cell))
+        gy1 = int(math.floor((cy + reach) / cell))
+        for gx in range(gx0, gx1 + 1):
+            for gy in range(gy0, gy1 + 1):
+                bucket = buckets.get((gx, gy))
+                if bucket:
+                    for _, px, py, pr in bucket:
+                        if (cx - px) ** 2 + (cy - py) ** 2 < (r + pr + spacing) ** 2:
+                            return True
+        return False
+
+
+def _index_cell_size(discs, max_dia, spacing_mm):
+    """Index cell size: the largest diameter that will be placed, plus spacing."""
+    largest = max([d for _, d in discs] + [max_dia])
+    return largest + spacing_mm
+
+
+def _nest_discs(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None,
+                progress=None, cancel=None):
+    """
+    Greedy circle-packing algorithm. Returns list of placed discs as (pad_size, cx, cy, r).
+    Discs that couldn't be placed are omitted from the result.
+
+    If polygon is provided (list of (x,y) tuples in mm), uses polygon nesting instead of rectangle.
+
+    Supports 'max' quantity: fixed-qty pads are placed first, then max pads fill remaining space,
+    either one scan at a time or, with settings["max_fill_pattern"] == "lattice", as one lattice.
+
+    The engine is chosen by settings["nesting_engine"]:
+    "raster" (1mm grid scan), "tangent" (analytic contact candidates),
+    "numpy" (vectorized clearance raster, falls back to "raster" without NumPy)
+    or "bitset" (pure-Python row bitsets). Polygon nesting supports "raster"
+    and "bitset"; other engines scan the polygon grid like "raster".
+
+    A per-material settings["nesting_resolution"] below 1mm replaces the grid
+    engines with a coarse-to-fine search that refines down to that resolution.
+
+    With settings["compaction"], the finished layout is compacted toward the
+    origin corner (or the polygon centroid) and freed room is refilled with
+    'max' pads (see _compact_layout).
+
+    settings["effort"] ("fast", "balanced" or "thorough", see EFFORT_LEVELS)
+    sets the grid step, refinement and a wall-clock cap; discs not placed when
+    the cap is hit are left out, and the result's timed_out flag is set.
+
+    Returns a NestResult: (placed, fixed_placed, fixed_total) plus timed_out.
+
+    progress, if given, is called with a progress dict (see _NestMonitor) a
+    few times a second. Setting the cancel token (CancelToken or any object
+    with is_set()) stops the nest and returns the partial layout so far.
+    """
+    if "nest_monitor" not in settings:
+        # One monitor (wall-clock cap, cancellation, progress) for the whole nest,
+        # whichever engines it goes through
+        monitor = _NestMonitor(time.monotonic() + _effort(settings)["time_limit"], progress, cancel)
+        placed, fixed_placed, fixed_total = _nest_discs(
+            pads, material, width_mm, height_mm, dict(settings, nest_monitor=monitor), spacing_mm, polygon=polygon)
+        monitor.finish(len(placed))
+        return NestResult(placed, fixed_placed, fixed_total, monitor.timed_out)
+
+    if settings.get("compaction", False):
+        result = _nest_discs(pads, material, width_mm, height_mm, dict(settings, compaction=False), spacing_mm, polygon=polygon)
+        return _compact_layout(result, pads, material, width_mm, height_mm, settings, spacing_mm, polygon)
+
+    if settings.get("max_fill_pattern", "scan") == "lattice" and any(p['qty'] == 'max' for p in pads):
+        return _nest_discs_lattice(pads, material, width_mm, height_mm, settings, spacing_mm, polygon)
+
+    if polygon:
+        return _nest_discs_polygon(pads, material, settings, polygon, spacing_mm)
+
+    engine = settings.get("nesting_engine", "raster")
+    if engine == "tangent":
+        return _nest_discs_tangent(pads, material, width_mm, height_mm, settings, spacing_mm)
+    resolution = _nesting_resolution(material, settings)
+    if resolution < 1:
+        return _nest_discs_refined(pads, material, width_mm, height_mm, settings, spacing_mm, resolution)
+    if engine == "numpy" and np is not None:
+        return _nest_discs_numpy(pads, material, width_mm, height_mm, settings, spacing_mm)
+    if engine == "bitset":
+        return _nest_discs_bitset(pads, material, width_mm, height_mm, settings, spacing_mm)
+
+    discs, max_pad = _expand_pads(pads, material, settings)
     placed = []
     fixed_total = len(discs)
     fixed_placed = 0
+    monitor = _monitor(settings)
+    monitor.start(fixed_total)
 
-    # Place fixed pads
-    for pad_size, dia in discs:
+    max_dia = get_disc_diameter(max_pad['size'], material, settings) if max_pad else 0
+    index = _DiscIndex(_index_cell_size(discs, max_dia, spacing_mm), spacing_mm)
+
+    # Per-diameter resume cursor (y, x). Placed discs only ever add obstacles, so
+    # every position a same-size disc already found blocked stays blocked; the
+    # next disc of that size (and each 'max' iteration) continues from there.
+    cursors = {}
+    step = _effort(settings)["grid_step"]
+
+    def scan(dia):
+        """First free position for a disc of this diameter, resuming from its cursor (None if stopped)."""
         r = dia / 2
-        placed_successfully = False
-        y = spacing_mm
-        while y + dia + spacing_mm <= height_mm and not placed_successfully:
-            x = spacing_mm
+        y, x = cursors.get(dia, (spacing_mm, spacing_mm))
+        while y + dia + spacing_mm <= height_mm:
             while x + dia + spacing_mm <= width_mm:
                 cx, cy = x + r, y + r
-                is_collision = any((cx - px)**2 + (cy - py)**2 < (r + pr + spacing_mm)**2 for _, px, py, pr in placed)
-                if not is_collision:
-                    placed.append((pad_size, cx, cy, r))
-                    placed_successfully = True
-                    fixed_placed += 1
-                    break
-                x += 1
-            y += 1
+                if not index.collides(cx, cy, r):
+                    cursors[dia] = (y, x)
+                    return cx, cy
+                x += step
+            y += step
+            x = spacing_mm
+            if monitor.row():
+                break
+        cursors[dia] = (y, spacing_mm)
+        return None
+
+    # Place fixed pads
+    for pad_size, dia in discs:
+        if monitor.step(len(placed)):
+            break
+        r = dia / 2
+        pos = scan(dia)
+        if pos:
+            placed.append((pad_size, pos[0], pos[1], r))
+            index.add(pad_size, pos[0], pos[1], r)
+            fixed_placed += 1
 
     # Fill remaining space with max pad (if any)
-    if max_pads:
-        max_pad = max_pads[0]
+    if max_pad:
         max_size = max_pad['size']
-        max_dia = get_disc_diameter(max_size, material, settings)
         max_r = max_dia / 2
 
-        while True:
-            placed_successfully = False
-            y = spacing_mm
-            while y + max_dia + spacing_mm <= height_mm and not placed_successfully:
-                x = spacing_mm
-                while x + max_dia + spacing_mm <= width_mm:
-                    cx, cy = x + max_r, y + max_r
-                    is_collision = any((cx - px)**2 + (cy - py)**2 < (max_r + pr + spacing_mm)**2 for _, px, py, pr in placed)
-                    if not is_collision:
-                        placed.append((max_size, cx, cy, max_r))
-                        placed_successfully = True
+        while not monitor.step(len(placed)):
+            pos = scan(max_dia)
+            if not pos:
+                break  # No more room for max pads
+            placed.append((max_size, pos[0], pos[1], max_r))
+            index.add(max_size, pos[0], pos[1], max_r)
+
+    return placed, fixed_placed, fixed_total
+
+
+# ==========================================
+# LATTICE MAX FILL
+# ==========================================
+
+def _lattice_points(pitch, row_pitch, row_shift, x_lo, x_hi, y_lo, y_hi, phase_x, phase_y):
+    """Centers of a row lattice clipped to [x_lo, x_hi] x [y_lo, y_hi]. Odd rows shift by row_shift."""
+    points = []
+    y = y_lo + phase_y
+    row = 0
+    while y <= y_hi:
+        # Wrap the shift back into the first pitch so odd rows don't lose their leftmost disc
+        x = x_lo + (phase_x + (row_shift if row % 2 else 0)) % pitch
+        while x <= x_hi:
+            points.append((x, y))
+            x += pitch
+        y += row_pitch
+        row += 1
+    return points
+
+
+def _lattice_fill(placed, max_size, max_r, x_lo, x_hi, y_lo, y_hi, spacing_mm, fits=None):
+    """
+    Fill the box of allowed centers with one lattice of max discs, in one pass.
+
+    Tries hexagonal and square lattices, with rows along either axis and a few
+    phase offsets. Each candidate lattice is clipped against the fixed discs
+    with the spatial index (and against fits(cx, cy), if given). The lattice
+    that keeps the most discs wins. Returns the new discs as (pad_size, cx, cy, r).
+    """
+    if x_lo > x_hi or y_lo > y_hi:
+        return []
+
+    # A hair over dia + spacing so lattice neighbours never round into a collision
+    pitch = 2 * max_r + spacing_mm + 1e-9
+    index = _DiscIndex(max([2 * pr for _, _, _, pr in placed] + [2 * max_r]) + spacing_mm, spacing_mm)
+    for disc in placed:
+        index.add(*disc)
+
+    lattices = [
+        (pitch, pitch * math.sqrt(3) / 2, pitch / 2),  # Hexagonal
+        (pitch, pitch, 0.0),                            # Square
+    ]
+    phases = [0.0, 0.25, 0.5, 0.75]
+
+    best = []
+    for along, row_pitch, row_shift in lattices:
+        for transpose in (False, True):
+            for fx in phases:
+                for fy in (0.0, 0.5):
+                    if transpose:
+                        points = [(x, y) for y, x in _lattice_points(
+                            along, row_pitch, row_shift, y_lo, y_hi, x_lo, x_hi, fx * along, fy * row_pitch)]
+                    else:
+                        points = _lattice_points(
+                            along, row_pitch, row_shift, x_lo, x_hi, y_lo, y_hi, fx * along, fy * row_pitch)
+                    if len(points) <= len(best):
+                        continue  # Can't beat the current best even unclipped
+                    kept = [
+                        (max_size, cx, cy, max_r) for cx, cy in points
+                        if not index.collides(cx, cy, max_r) and (fits is None or fits(cx, cy))
+                    ]
+                    if len(kept) > len(best):
+                        best = kept
+    return best
+
+
+def _nest_discs_lattice(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None):
+    """
+    Nest fixed pads with the selected engine, then fill with the 'max' pad as a
+    single clipped lattice (see _lattice_fill) instead of one scan per disc.
+    The lattice is chosen by disc count, so settings["max_fill_style"] (a scan
+    order) does not apply here.
+    """
+    fixed_pads = [p for p in pads if p['qty'] != 'max']
+    max_pad = next(p for p in pads if p['qty'] == 'max')
+    max_size = max_pad['size']
+    max_r = get_disc_diameter(max_size, material, settings) / 2
+
+    placed, fixed_placed, fixed_total = _nest_discs(
+        fixed_pads, material, width_mm, height_mm, settings, spacing_mm, polygon=polygon)
+
+    if polygon:
+        x_lo = min(p[0] for p in polygon) + spacing_mm + max_r
+        x_hi = max(p[0] for p in polygon) - spacing_mm - max_r
+        y_lo = min(p[1] for p in polygon) + spacing_mm + max_r
+        y_hi = max(p[1] for p in polygon) - spacing_mm - max_r
+        fits = lambda cx, cy: _circle_fits_in_polygon(cx, cy, max_r, polygon, spacing_mm)
+    else:
+        x_lo, x_hi = spacing_mm + max_r, width_mm - spacing_mm - max_r
+        y_lo, y_hi = spacing_mm + max_r, height_mm - spacing_mm - max_r
+        fits = None
+
+    placed = placed + _lattice_fill(placed, max_size, max_r, x_lo, x_hi, y_lo, y_hi, spacing_mm, fits)
+    return placed, fixed_placed, fixed_total
+
+
+# ==========================================
+# COARSE-TO-FINE SEARCH
+# ==========================================
+
+# Grid step of the coarse pass (mm)
+COARSE_STEP_MM = 4.0
+
+# How many of the best coarse candidates get refined
+REFINE_CANDIDATES = 4
+
+# Finest per-material nesting resolution accepted (mm); 1.0 is the coarsest
+MIN_NESTING_RESOLUTION_MM = 0.05
+
+
+# ==========================================
+# NESTING EFFORT
+# ==========================================
+
+# Speed/quality presets for settings["effort"]:
+#   grid_step          scan grid step (mm) of the raster, bitset, numpy and polygon engines
+#   coarse_step        coarse pass step (mm) of the coarse-to-fine search
+#   refine_candidates  coarse candidates refined per disc
+#   resolution         finest search step (mm); below 1 enables the coarse-to-fine search
+#   time_limit         wall-clock cap (s) on one nest
+EFFORT_LEVELS = {
+    "fast": {"grid_step": 2, "coarse_step": 8.0, "refine_candidates": 1, "resolution": 1.0, "time_limit": 5.0},
+    "balanced": {"grid_step": 1, "coarse_step": COARSE_STEP_MM, "refine_candidates": REFINE_CANDIDATES,
+                 "resolution": 1.0, "time_limit": 60.0},
+    "thorough": {"grid_step": 1, "coarse_step": 2.0, "refine_candidates": 8, "resolution": 0.5, "time_limit": 300.0},
+}
+
+
+def _effort(settings):
+    """Preset for settings["effort"] (unknown values count as "balanced")."""
+    return EFFORT_LEVELS.get(settings.get("effort", "balanced"), EFFORT_LEVELS["balanced"])
+
+
+# ==========================================
+# PROGRESS & CANCELLATION
+# ==========================================
+
+# Minimum seconds between progress callbacks
+PROGRESS_INTERVAL_S = 0.1
+
+
+class CancelToken:
+    """
+    Flag for stopping a running nest from another thread. Any object with an
+    is_set() method (threading.Event, multiprocessing.Event) works the same.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_set(self):
+        return self._event.is_set()
+
+
+class NestResult(tuple):
+    """
+    A nest's (placed, fixed_placed, fixed_total), unpacked like a plain tuple.
+    timed_out is True when the effort level's wall-clock cap stopped the nest
+    early, so discs left out may still fit: the result is not a "doesn't fit"
+    verdict and is never cached.
+    """
+
+    def __new__(cls, placed, fixed_placed, fixed_total, timed_out=False):
+        result = super().__new__(cls, (placed, fixed_placed, fixed_total))
+        result.timed_out = timed_out
+        return result
+
+    def __reduce__(self):
+        # Keep the flag when results come back from pool workers
+        return NestResult, (self[0], self[1], self[2], self.timed_out)
+
+
+class _NestMonitor:
+    """
+    Wall-clock cap, cancellation and progress for one nest.
+
+    Engines call start() once they know how many fixed discs there are, step()
+    before each placement (it returns True when the nest must stop) and row()
+    per scanned grid row (likewise, so a long scan stops mid-way). The progress callback receives a dict with 'placed'
+    (discs placed so far), 'fixed_done' / 'fixed_total', 'rows' (grid rows
+    scanned), 'phase' ("fixed", "max" or "done"), 'elapsed' and 'eta' seconds
+    ('eta' is None while filling 'max' pads, whose count isn't known up front).
+    """
+
+    def __init__(self, deadline=math.inf, progress=None, cancel=None):
+        self.deadline = deadline
+        self.progress = progress
+        self.cancel = cancel
+        self.timed_out = False
+        self.started = time.monotonic()
+        self.last_report = 0.0
+        self.total = 0
+        self.done = 0
+        self.placed = 0
+        self.rows = 0
+
+    def start(self, total):
+        self.total = total
+        self.done = 0
+
+    def stopped(self):
+        """True once the nest is past its deadline (also setting timed_out) or has been cancelled."""
+        if self.cancel is not None and self.cancel.is_set():
+            return True
+        if time.monotonic() > self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def step(self, placed):
+        """Record one placement attempt; returns True when the nest must stop."""
+        self.done += 1
+        self.placed = placed
+        self._report()
+        return self.stopped()
+
+    def row(self):
+        """Record one scanned grid row; returns True when the nest must stop."""
+        self.rows += 1
+        self._report()
+        return self.stopped()
+
+    def _report(self, phase=None):
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if phase is None and now - self.last_report < PROGRESS_INTERVAL_S:
+            return
+        self.last_report = now
+        elapsed = now - self.started
+        fixed_done = min(max(self.done - 1, 0), self.total)
+        if phase is None:
+            phase = "fixed" if self.done <= self.total else "max"
+        eta = None
+        if phase == "fixed" and fixed_done:
+            eta = elapsed / fixed_done * (self.total - fixed_done)
+        elif phase == "done":
+            eta = 0.0
+        self.progress({
+            'placed': self.placed, 'fixed_done': fixed_done, 'fixed_total': self.total,
+            'rows': self.rows, 'phase': phase, 'elapsed': elapsed, 'eta': eta,
+        })
+
+    def finish(self, placed):
+        """Final report once the nest returns (complete or cancelled)."""
+        self.placed = placed
+        self.done = max(self.done, self.total + 1)
+        self._report("done")
+
+
+def _monitor(settings, progress=None, cancel=None):
+    """The running nest's monitor, or a fresh one (no time cap) for a direct engine call."""
+    monitor = settings.get("nest_monitor")
+    if monitor is None:
+        monitor = _NestMonitor(progress=progress, cancel=cancel)
+    return monitor
+
+
+def _nesting_resolution(material, settings):
+    """
+    Finest search step for this material in mm (1.0 = plain 1mm grid), capped by the effort level.
+    Values are clamped to MIN_NESTING_RESOLUTION_MM..1.0 (invalid ones count as 1.0), since the
+    refinement halves its step until it reaches the resolution.
+    """
+    try:
+        resolution = float(settings.get("nesting_resolution", {}).get(material, 1.0))
+    except (TypeError, ValueError):
+        resolution = 1.0
+    if math.isnan(resolution):
+        resolution = 1.0
+    resolution = min(max(resolution, MIN_NESTING_RESOLUTION_MM), 1.0)
+    return min(resolution, _effort(settings)["resolution"])
+
+
+def _refine_position(pos, score, score_fn, feasible, start_step, resolution):
+    """
+    Pattern search around a feasible position: move to the first better
+    feasible neighbour (8 directions) until none improves, then halve the step,
+    finishing at exactly `resolution`. Returns (pos, score).
+    """
+    h = max(start_step / 2, resolution)
+    while True:
+        moved = True
+        while moved:
+            moved = False
+            cx, cy = pos
+            for dx, dy in ((0, -h), (-h, 0), (-h, -h), (h, -h), (0, h), (h, 0), (-h, h), (h, h)):
+                nx, ny = cx + dx, cy + dy
+                if feasible(nx, ny):
+                    new_score = score_fn(nx, ny)
+                    if new_score < score:
+                        pos, score, moved = (nx, ny), new_score, True
                         break
-                    x += 1
-                y += 1
-            if not placed_successfully:
+        if h <= resolution:
+            return pos, score
+        h = max(h / 2, resolution)
+
+
+def _nest_discs_refined(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, resolution=0.1):
+    """
+    Rectangle nesting with a coarse-to-fine search instead of a 1mm scan.
+
+    A coarse pass (COARSE_STEP_MM, or the effort level's) finds the first few feasible cells in scan
+    order, then each is pattern-searched up and left down to `resolution`.
+    If the coarse grid misses a tight gap, the 1mm grid is tried before giving up.
+    """
+    discs, max_pad = _expand_pads(pads, material, settings)
+    placed = []
+    fixed_total = len(discs)
+    fixed_placed = 0
+    monitor = _monitor(settings)
+    monitor.start(fixed_total)
+
+    max_dia = get_disc_diameter(max_pad['size'], material, settings) if max_pad else 0
+    index = _DiscIndex(_index_cell_size(discs, max_dia, spacing_mm), spacing_mm)
+
+    # Coarse rows known full per diameter, and diameters that no longer fit
+    # anywhere (placed discs only ever add obstacles)
+    cursors = {}
+    exhausted = set()
+    effort = _effort(settings)
+    coarse_step, candidates = effort["coarse_step"], effort["refine_candidates"]
+
+    def find(dia):
+        if dia in exhausted:
+            return None
+        r = dia / 2
+        lo_x, hi_x = spacing_mm + r, width_mm - spacing_mm - r
+        lo_y, hi_y = spacing_mm + r, height_mm - spacing_mm - r
+
+        def feasible(cx, cy):
+            return lo_x <= cx <= hi_x and lo_y <= cy <= hi_y and not index.collides(cx, cy, r)
+
+        def score_fn(cx, cy):
+            return (cy, cx)  # Raster order: lowest row first, then leftmost
+
+        for grid_step in (coarse_step, 1.0):
+            found = []
+            row = cursors.get(dia, 0) if grid_step == coarse_step else 0
+            ys = _grid_axis(spacing_mm, height_mm - spacing_mm - r, r, grid_step)
+            xs = _grid_axis(spacing_mm, width_mm - spacing_mm - r, r, grid_step)
+            while row < len(ys) and len(found) < candidates:
+                cy = ys[row]
+                for cx in xs:
+                    if feasible(cx, cy):
+                        found.append((cx, cy))
+                        if len(found) == candidates:
+                            break
+                if not found:
+                    row += 1
+                    if monitor.row():
+                        return None  # Stopped mid-scan
+                else:
+                    break
+            if grid_step == coarse_step:
+                cursors[dia] = row
+            if found:
+                break
+        else:
+            exhausted.add(dia)
+            return None
+
+        best_pos, best_score = None, None
+        for start in found:
+            pos, pos_score = _refine_position(start, score_fn(*start), score_fn, feasible, grid_step, resolution)
+            if best_score is None or pos_score < best_score:
+                best_pos, best_score = pos, pos_score
+        return best_pos
+
+    # Place fixed pads
+    for pad_size, dia in discs:
+        if monitor.step(len(placed)):
+            break
+        r = dia / 2
+        pos = find(dia)
+        if pos:
+            placed.append((pad_size, pos[0], pos[1], r))
+            index.add(pad_size, pos[0], pos[1], r)
+            fixed_placed += 1
+
+    # Fill remaining space with max pad (if any)
+    if max_pad:
+        max_size = max_pad['size']
+        max_r = max_dia / 2
+        while not monitor.step(len(placed)):
+            pos = find(max_dia)
+            if not pos:
+                break  # No more room for max pads
+            placed.append((max_size, pos[0], pos[1], max_r))
+            index.add(max_size, pos[0], pos[1], max_r)
+
+    return placed, fixed_placed, fixed_total
+
+
+# ==========================================
+# TANGENT-CANDIDATE ENGINE
+# ==========================================
+
+# Slack for treating analytically tangent discs as touching (mm)
+TANGENT_TOLERANCE = 1e-6
+
+
+def _tangent_candidates(r, placed, index, lo_x, hi_x, lo_y, hi_y, spacing_mm):
+    """
+    Candidate centers for a disc of radius r that touch two things at once:
+    two sheet edges (corners), a placed disc and an edge, or two placed discs.
+    The feasible region is bounded by those curves, so its bottom-left-most
+    point is always one of these candidates.
+    """
+    candidates = [(lo_x, lo_y), (hi_x, lo_y), (lo_x, hi_y), (hi_x, hi_y)]
+
+    for _, px, py, pr in placed:
+        d = r + pr + spacing_mm
+
+        # Disc + sheet edge
+        for ex in (lo_x, hi_x):
+            dx = ex - px
+            if abs(dx) <= d:
+                h = math.sqrt(d * d - dx * dx)
+                candidates.append((ex, py - h))
+                candidates.append((ex, py + h))
+        for ey in (lo_y, hi_y):
+            dy = ey - py
+            if abs(dy) <= d:
+                h = math.sqrt(d * d - dy * dy)
+                candidates.append((px - h, ey))
+                candidates.append((px + h, ey))
+
+        # Disc + disc (each pair once)
+        for _, qx, qy, qr in index.near(px, py, d + r + index.max_r + spacing_mm):
+            if (qx, qy) <= (px, py):
+                continue
+            e = r + qr + spacing_mm
+            dx, dy = qx - px, qy - py
+            dist = math.sqrt(dx * dx + dy * dy)
+            if dist == 0 or dist > d + e or dist < abs(d - e):
+                continue
+            a = (d * d - e * e + dist * dist) / (2 * dist)
+            h = math.sqrt(max(d * d - a * a, 0.0))
+            mx, my = px + a * dx / dist, py + a * dy / dist
+            ox, oy = h * dy / dist, h * dx / dist
+            candidates.append((mx - ox, my + oy))
+            candidates.append((mx + ox, my - oy))
+
+    return candidates
+
+
+def _place_tangent(r, placed, index, width_mm, height_mm, spacing_mm):
+    """Return the bottom-left-most feasible tangent center for radius r, or None."""
+    lo_x, hi_x = spacing_mm + r, width_mm - spacing_mm - r
+    lo_y, hi_y = spacing_mm + r, height_mm - spacing_mm - r
+    if lo_x > hi_x or lo_y > hi_y:
+        return None
+
+    tol = TANGENT_TOLERANCE
+    in_bounds = [
+        (cx, cy) for cx, cy in _tangent_candidates(r, placed, index, lo_x, hi_x, lo_y, hi_y, spacing_mm)
+        if lo_x - tol <= cx <= hi_x + tol and lo_y - tol <= cy <= hi_y + tol
+    ]
+    # Same order as the raster scan: lowest row first, then leftmost
+    in_bounds.sort(key=lambda c: (round(c[1], 6), round(c[0], 6)))
+
+    for cx, cy in in_bounds:
+        if not index.collides(cx, cy, r, tolerance=tol):
+            return min(max(cx, lo_x), hi_x), min(max(cy, lo_y), hi_y)
+    return None
+
+
+def _nest_discs_tangent(pads, material, width_mm, height_mm, settings, spacing_mm=1.0):
+    """
+    Rectangle nesting that only considers analytic candidate centers (see
+    _tangent_candidates) instead of scanning a 1mm grid. Discs end up in exact
+    contact at spacing_mm, with no grid quantization.
+
+    Same inputs, ordering and return value as the raster path of _nest_discs.
+    """
+    discs, max_pad = _expand_pads(pads, material, settings)
+    placed = []
+    fixed_total = len(discs)
+    fixed_placed = 0
+    monitor = _monitor(settings)
+    monitor.start(fixed_total)
+
+    max_dia = get_disc_diameter(max_pad['size'], material, settings) if max_pad else 0
+    index = _DiscIndex(_index_cell_size(discs, max_dia, spacing_mm), spacing_mm)
+
+    # Place fixed pads
+    for pad_size, dia in discs:
+        if monitor.step(len(placed)):
+            break
+        r = dia / 2
+        pos = _place_tangent(r, placed, index, width_mm, height_mm, spacing_mm)
+        if pos:
+            placed.append((pad_size, pos[0], pos[1], r))
+            index.add(pad_size, pos[0], pos[1], r)
+            fixed_placed += 1
+
+    # Fill remaining space with max pad (if any)
+    if max_pad:
+        max_size = max_pad['size']
+        max_r = max_dia / 2
+        while not monitor.step(len(placed)):
+            pos = _place_tangent(max_r, placed, index, width_mm, height_mm, spacing_mm)
+            if not pos:
                 break  # No more room for max pads
+            placed.append((max_size, pos[0], pos[1], max_r))
+            index.add(max_size, pos[0], pos[1], max_r)
+
+    return placed, fixed_placed, fixed_total
+
+
+# ==========================================
+# NUMPY CLEARANCE ENGINE
+# ==========================================
+
+class _ClearanceRaster:
+    """
+    Clearance field for one disc radius on the raster grid (1mm unless the
+    effort level says otherwise).
+
+    Each cell is a candidate center (same positions the raster scan visits) and
+    holds the distance to the edge of the nearest placed disc. A center is free
+    when its clearance is at least r + spacing, so finding the first free center
+    is one vectorized threshold instead of a Python double loop. Sheet edges are
+    handled by only storing in-bounds centers.
+    """
+
+    def __init__(self, r, width_mm, height_mm, spacing_mm, step=1):
+        self.r = r
+        self.spacing = spacing_mm
+        self.step = step
+        nx = int(math.floor((width_mm - 2 * r - 2 * spacing_mm) / step)) + 1
+        ny = int(math.floor((height_mm - 2 * r - 2 * spacing_mm) / step)) + 1
+        self.nx, self.ny = max(nx, 0), max(ny, 0)
+        self.xs = (spacing_mm + np.arange(self.nx, dtype=float) * step) + r
+        self.ys = (spacing_mm + np.arange(self.ny, dtype=float) * step) + r
+        self.field = np.full((self.ny, self.nx), np.inf)
+
+    def add(self, px, py, pr):
+        """Lower the clearance in the local window a new disc can affect."""
+        if not self.nx or not self.ny:
+            return
+        reach = pr + self.r + self.spacing
+        x_start = self.xs[0]
+        y_start = self.ys[0]
+        step = self.step
+        i0 = max(0, int(math.ceil((px - reach - x_start) / step)))
+        i1 = min(self.nx, int(math.floor((px + reach - x_start) / step)) + 1)
+        j0 = max(0, int(math.ceil((py - reach - y_start) / step)))
+        j1 = min(self.ny, int(math.floor((py + reach - y_start) / step)) + 1)
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        dx = self.xs[i0:i1] - px
+        dy = self.ys[j0:j1] - py
+        dist = np.sqrt(dy[:, None] ** 2 + dx[None, :] ** 2) - pr
+        window = self.field[j0:j1, i0:i1]
+        np.minimum(window, dist, out=window)
+
+    def first_free(self):
+        """First free center in raster scan order (row by row), or None."""
+        if not self.nx or not self.ny:
+            return None
+        free = self.field >= self.r + self.spacing
+        k = int(np.argmax(free))  # Row-major, same order as the raster scan
+        if not free.flat[k]:
+            return None
+        j, i = divmod(k, self.nx)
+        return float(self.xs[i]), float(self.ys[j])
+
+
+def _nest_discs_numpy(pads, material, width_mm, height_mm, settings, spacing_mm=1.0):
+    """
+    Rectangle nesting backed by per-radius NumPy clearance rasters.
+
+    Visits the same 1mm grid in the same order as the raster path of
+    _nest_discs, but each placement is an array threshold plus a local window
+    update, which keeps 1000+ disc jobs out of per-cell Python overhead.
+    """
+    discs, max_pad = _expand_pads(pads, material, settings)
+    placed = []
+    fixed_total = len(discs)
+    fixed_placed = 0
+    monitor = _monitor(settings)
+    monitor.start(fixed_total)
+    rasters = {}
+    step = _effort(settings)["grid_step"]
+
+    def raster_for(r):
+        raster = rasters.get(r)
+        if raster is None:
+            raster = rasters[r] = _ClearanceRaster(r, width_mm, height_mm, spacing_mm, step)
+            for _, px, py, pr in placed:
+                raster.add(px, py, pr)
+        return raster
+
+    def place(pad_size, r):
+        pos = raster_for(r).first_free()
+        if pos is None:
+            return False
+        placed.append((pad_size, pos[0], pos[1], r))
+        for raster in rasters.values():
+            raster.add(pos[0], pos[1], r)
+        return True
+
+    # Place fixed pads
+    for pad_size, dia in discs:
+        if monitor.step(len(placed)):
+            break
+        if place(pad_size, dia / 2):
+            fixed_placed += 1
+
+    # Fill remaining space with max pad (if any)
+    if max_pad:
+        max_size = max_pad['size']
+        max_r = get_disc_diameter(max_size, material, settings) / 2
+        while not monitor.step(len(placed)) and place(max_size, max_r):
+            pass
+
+    return placed, fixed_placed, fixed_total
+
+
+# ==========================================
+# BITSET OCCUPANCY ENGINE (pure Python)
+# ==========================================
+
+def _grid_axis(start, limit, r, step=1, spacing=None):
+    """
+    Center coordinates along one axis of the scan grid: start, start+step, ...
+    while the disc edge stays within limit. Accumulates the same way as the
+    scan loops, so coordinates match them exactly.
+
+    With spacing, limit is the sheet size and the bound is the raster scan's
+    own x + dia + spacing <= width test, evaluated the same way so the grids
+    agree even where the two forms round differently.
+    """
+    reach, margin = (2 * r, spacing) if spacing is not None else (r, 0.0)
+    centers = []
+    v = start
+    while v + reach + margin <= limit:
+        centers.append(v + r)
+        v += step
+    return centers
+
+
+class _RowBitset:
+    """
+    Blocked-center bitsets for one disc radius on a scan grid.
+
+    Each grid row is a Python int with bit i set when the center at column i is
+    unavailable (collides with a placed disc, or is outside the usable area).
+    Finding the first free column is the lowest-set-bit trick on the inverted
+    row, so no per-millimetre collision test is needed.
+    """
+
+    def __init__(self, r, xs, ys, spacing_mm, valid_rows=None):
+        self.r = r
+        self.xs = xs
+        self.ys = ys
+        self.spacing = spacing_mm
+        self.full = (1 << len(xs)) - 1
+        self.cursor = 0  # Rows before this are known full for this radius
+        if valid_rows is None:
+            self.rows = [0] * len(ys)
+        else:
+            self.rows = [self.full & ~valid for valid in valid_rows]
+
+    def block_disc(self, px, py, pr):
+        """Set the bits of every center that would collide with a disc at (px, py)."""
+        xs, ys, rows = self.xs, self.ys, self.rows
+        if not xs:
+            return
+        reach = self.r + pr + self.spacing
+        reach_sq = reach ** 2
+        n = len(xs)
+        j = bisect.bisect_left(ys, py - reach)
+        j_end = bisect.bisect_right(ys, py + reach)
+        while j < j_end:
+            dy_sq = (ys[j] - py) ** 2
+            if dy_sq < reach_sq:
+                half = math.sqrt(reach_sq - dy_sq)
+                i0 = bisect.bisect_left(xs, px - half)
+                i1 = bisect.bisect_right(xs, px + half)
+                # Settle the span ends on the exact collision predicate
+                while i0 > 0 and (xs[i0 - 1] - px) ** 2 + dy_sq < reach_sq:
+                    i0 -= 1
+                while i0 < i1 and (xs[i0] - px) ** 2 + dy_sq >= reach_sq:
+                    i0 += 1
+                while i1 < n and (xs[i1] - px) ** 2 + dy_sq < reach_sq:
+                    i1 += 1
+                while i1 > i0 and (xs[i1 - 1] - px) ** 2 + dy_sq >= reach_sq:
+                    i1 -= 1
+                if i0 < i1:
+                    rows[j] |= ((1 << (i1 - i0)) - 1) << i0
+            j += 1
+
+    def first_free(self):
+        """First free center in row-by-row scan order, or None. Resumes from the row cursor."""
+        full, rows = self.full, self.rows
+        j = self.cursor
+        while j < len(rows):
+            free = ~rows[j] & full
+            if free:
+                self.cursor = j
+                i = (free & -free).bit_length() - 1
+                return self.xs[i], self.ys[j]
+            j += 1
+        self.cursor = j
+        return None
+
+
+def _nest_discs_bitset(pads, material, width_mm, height_mm, settings, spacing_mm=1.0):
+    """
+    Rectangle nesting on per-radius row bitsets (see _RowBitset).
+
+    Visits the same 1mm grid in the same order as the raster path of
+    _nest_discs, so layouts match it, but needs nothing beyond the standard
+    library.
+    """
+    discs, max_pad = _expand_pads(pads, material, settings)
+    placed = []
+    fixed_total = len(discs)
+    fixed_placed = 0
+    monitor = _monitor(settings)
+    monitor.start(fixed_total)
+    bitsets = {}
+    step = _effort(settings)["grid_step"]
+
+    def bitset_for(r):
+        bitset = bitsets.get(r)
+        if bitset is None:
+            # Same bounds test as the raster scan: x + dia + spacing <= width
+            xs = _grid_axis(spacing_mm, width_mm, r, step, spacing=spacing_mm)
+            ys = _grid_axis(spacing_mm, height_mm, r, step, spacing=spacing_mm)
+            bitset = bitsets[r] = _RowBitset(r, xs, ys, spacing_mm)
+            for _, px, py, pr in placed:
+                bitset.block_disc(px, py, pr)
+        return bitset
+
+    def place(pad_size, r):
+        pos = bitset_for(r).first_free()
+        if pos is None:
+            return False
+        placed.append((pad_size, pos[0], pos[1], r))
+        for bitset in bitsets.values():
+            bitset.block_disc(pos[0], pos[1], r)
+        return True
+
+    # Place fixed pads
+    for pad_size, dia in discs:
+        if monitor.step(len(placed)):
+            break
+        if place(pad_size, dia / 2):
+            fixed_placed += 1
+
+    # Fill remaining space with max pad (if any)
+    if max_pad:
+        max_size = max_pad['size']
+        max_r = get_disc_diameter(max_size, material, settings) / 2
+        while not monitor.step(len(placed)) and place(max_size, max_r):
+            pass
 
     return placed, fixed_placed, fixed_total
 
@@ -209,6 +1147,29 @@ def _point_in_polygon(x, y, polygon):
     return inside
 
 
+def _points_in_polygon(xs, ys, polygon):
+    """
+    Even-odd test of _point_in_polygon for every grid point at once (needs NumPy).
+    Returns a boolean array indexed [row, column], rows along ys.
+
+    An edge's crossing x depends only on the row, so each edge costs one
+    per-row division and one comparison over the grid, with the same
+    arithmetic as the scalar test so both always agree.
+    """
+    x = np.asarray(xs, dtype=float)[None, :]
+    y = np.asarray(ys, dtype=float)[:, None]
+    inside = np.zeros((len(ys), len(xs)), dtype=bool)
+    n = len(polygon)
+    j = n - 1
+    for i in range(n):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if yi != yj:  # Horizontal edges never cross a row
+            inside ^= ((yi > y) != (yj > y)) & (x < (xj - xi) * (y - yi) / (yj - yi) + xi)
+        j = i
+    return inside
+
+
 def _distance_point_to_segment(px, py, x1, y1, x2, y2):
     """
     Calculate the minimum distance from point (px, py) to line segment (x1,y1)-(x2,y2).
@@ -296,7 +1257,309 @@ def _find_longest_edge(polygon):
     return longest[0], longest[1], longest_len, longest_idx
 
 
-def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0):
+def _signed_distance(x, y, polygon):
+    """Distance from (x, y) to the nearest polygon edge: positive inside, negative outside."""
+    dist = _distance_to_nearest_edge(x, y, polygon)
+    return dist if _point_in_polygon(x, y, polygon) else -dist
+
+
+# ==========================================
+# POLYGON DISTANCE FIELD
+# ==========================================
+
+class _PolygonField:
+    """
+    Signed distance to the polygon boundary at every center of one scan grid.
+
+    Distances are positive inside and negative outside, stored row by row in
+    an array('d'). The polygon never changes during a nest, so a disc of radius
+    r fits at a grid center exactly when the stored distance is at least
+    r + spacing: one lookup instead of a ray cast plus a distance to every edge.
+    With NumPy the whole grid is filled up front (one vectorized pass per edge);
+    without it each cell is filled on first use. Points off the grid (the
+    coarse-to-fine refinement) fall back to the exact calculation.
+    """
+
+    def __init__(self, polygon, xs, ys):
+        self.polygon = polygon
+        self.xs = xs
+        self.ys = ys
+        self.cols = {x: i for i, x in enumerate(xs)}
+        self.rows = {y: j for j, y in enumerate(ys)}
+        if np is not None and xs and ys:
+            inside = _points_in_polygon(xs, ys, polygon)
+            self.values = array('d', self._numpy_distances(inside).tobytes())
+        else:
+            self.values = array('d', [math.nan]) * (len(xs) * len(ys))  # NaN = not filled yet
+
+    def _numpy_distances(self, inside):
+        """Signed distances for the whole grid, using the same arithmetic as _distance_point_to_segment."""
+        polygon = self.polygon
+        px = np.array(self.xs)[None, :]
+        py = np.array(self.ys)[:, None]
+        dist = np.full((len(self.ys), len(self.xs)), np.inf)
+        n = len(polygon)
+        for i in range(n):
+            x1, y1 = polygon[i]
+            x2, y2 = polygon[(i + 1) % n]
+            dx = x2 - x1
+            dy = y2 - y1
+            length_sq = dx * dx + dy * dy
+            if length_sq == 0:
+                edge = np.sqrt((px - x1) ** 2 + (py - y1) ** 2)
+            else:
+                t = np.clip(((px - x1) * dx + (py - y1) * dy) / length_sq, 0, 1)
+                edge = np.sqrt((px - (x1 + t * dx)) ** 2 + (py - (y1 + t * dy)) ** 2)
+            np.minimum(dist, edge, out=dist)
+        return np.where(inside, dist, -dist).ravel()
+
+    def signed_distance(self, x, y):
+        """Signed boundary distance at (x, y): a lookup on the grid, exact off it."""
+        i = self.cols.get(x)
+        j = self.rows.get(y)
+        if i is None or j is None:
+            return _signed_distance(x, y, self.polygon)
+        k = j * len(self.xs) + i
+        dist = self.values[k]
+        if dist != dist:
+            dist = self.values[k] = _signed_distance(x, y, self.polygon)
+        return dist
+
+
+# ==========================================
+# POLYGON ROW SPANS
+# ==========================================
+
+def _linear_interval(k, b, lo, hi, strict=False):
+    """
+    x-interval where lo <= k*x + b <= hi (lo < k*x + b < hi if strict):
+    (x_lo, x_hi), or None when empty. Bounds are returned as given either way,
+    so strictness only decides the k == 0 case.
+    """
+    if k == 0:
+        inside = lo < b < hi if strict else lo <= b <= hi
+        return (-math.inf, math.inf) if inside else None
+    a, c = (lo - b) / k, (hi - b) / k
+    return (a, c) if a <= c else (c, a)
+
+
+def _edge_exclusion(y, x1, y1, x2, y2, clearance):
+    """
+    x-interval of row y closer than clearance to segment (x1,y1)-(x2,y2), or None.
+
+    The zone around a segment (a stadium) is convex, so its cut by the row is
+    one interval: the union of the cuts of the two end discs and of the band
+    where the point projects onto the segment within clearance of its line.
+    """
+    lo, hi = math.inf, -math.inf
+    for vx, vy in ((x1, y1), (x2, y2)):
+        dy = y - vy
+        if abs(dy) < clearance:
+            half = math.sqrt(clearance * clearance - dy * dy)
+            lo, hi = min(lo, vx - half), max(hi, vx + half)
+
+    dx = x2 - x1
+    dy = y2 - y1
+    length = math.hypot(dx, dy)
+    if length > 0:
+        # Projection (x - x1)*dx + (y - y1)*dy in [0, length^2] and signed
+        # offset (x - x1)*dy - (y - y1)*dx under clearance*length: both linear in x
+        # (a row exactly clearance from a horizontal edge is still allowed)
+        along = _linear_interval(dx, (y - y1) * dy - x1 * dx, 0.0, length * length)
+        across = _linear_interval(dy, -(y - y1) * dx - x1 * dy, -clearance * length, clearance * length,
+                                  strict=True)
+        if along and across:
+            band_lo, band_hi = max(along[0], across[0]), min(along[1], across[1])
+            if band_lo <= band_hi:
+                lo, hi = min(lo, band_lo), max(hi, band_hi)
+
+    return (lo, hi) if lo <= hi else None
+
+
+def _row_spans(y, polygon, clearance):
+    """
+    x-intervals of row y where a center is inside the polygon and at least
+    clearance from every edge: the even-odd inside intervals of the row, minus
+    each edge's exclusion interval. Returns sorted, disjoint (lo, hi) pairs.
+    """
+    crossings = []
+    n = len(polygon)
+    j = n - 1
+    for i in range(n):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y):
+            crossings.append((xj - xi) * (y - yi) / (yj - yi) + xi)
+        j = i
+    crossings.sort()
+
+    excluded = []
+    for i in range(n):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % n]
+        interval = _edge_exclusion(y, x1, y1, x2, y2, clearance)
+        if interval:
+            excluded.append(interval)
+    excluded.sort()
+
+    spans = []
+    for k in range(0, len(crossings) - 1, 2):
+        lo, hi = crossings[k], crossings[k + 1]
+        for ex_lo, ex_hi in excluded:
+            if ex_hi < lo:
+                continue
+            if ex_lo > hi:
+                break
+            if ex_lo > lo:
+                spans.append((lo, ex_lo))
+            lo = max(lo, ex_hi)
+        if lo <= hi:
+            spans.append((lo, hi))
+    return spans
+
+
+class _RowSpans:
+    """
+    Valid centers for one disc radius on one scan grid, row by row.
+
+    Each row holds the analytic x-intervals where the disc stays clear of the
+    polygon edges (see _row_spans) as ranges of grid columns, so scans walk
+    only valid cells and need no polygon test. A span end that falls between
+    grid columns also yields its own center, touching the edge exactly
+    (within TANGENT_TOLERANCE) instead of up to one grid step short of it.
+    Those contact centers are checked with the exact distance test.
+    """
+
+    def __init__(self, polygon, xs, ys, clearance):
+        self.xs = xs
+        self.ys = ys
+        self.rows = []  # Per row: [(first column, end column, contact centers before, after), ...]
+        for cy in ys:
+            row = []
+            for lo, hi in _row_spans(cy, polygon, clearance):
+                i0 = bisect.bisect_left(xs, lo)
+                i1 = bisect.bisect_right(xs, hi)
+                before, after = [], []
+                lo_x, hi_x = lo + TANGENT_TOLERANCE, hi - TANGENT_TOLERANCE
+                if lo_x > hi_x:
+                    lo_x = hi_x = (lo + hi) / 2
+                if i0 == i1 or xs[i0] > lo_x:
+                    before.append(lo_x)
+                if hi_x > lo_x and (i0 == i1 or xs[i1 - 1] < hi_x):
+                    after.append(hi_x)
+                before = [x for x in before if _signed_distance(x, cy, polygon) >= clearance]
+                after = [x for x in after if _signed_distance(x, cy, polygon) >= clearance]
+                row.append((i0, i1, before, after))
+            self.rows.append(row)
+
+    def valid_mask(self, j):
+        """Grid columns of row j inside the spans, as a bitmask."""
+        mask = 0
+        for i0, i1, _, _ in self.rows[j]:
+            mask |= ((1 << (i1 - i0)) - 1) << i0
+        return mask
+
+    def free_cells(self, bitset, collides, monitor):
+        """
+        cells() for the bitset engine: grid cells blocked in bitset (a _RowBitset
+        on the same grid) are skipped, and contact centers are kept only where
+        collides(cx, cy) is False. Visits the same centers in the same order as
+        cells() followed by a collision test, so both engines nest alike.
+        """
+        xs = self.xs
+        for j, (cy, row) in enumerate(zip(self.ys, self.rows)):
+            if monitor.row():
+                return
+            free = ~bitset.rows[j] & bitset.full
+            for i0, i1, before, after in row:
+                for cx in before:
+                    if not collides(cx, cy):
+                        yield cx, cy
+                span = (free >> i0) & ((1 << (i1 - i0)) - 1)
+                while span:
+                    low = span & -span
+                    yield xs[i0 + low.bit_length() - 1], cy
+                    span ^= low
+                for cx in after:
+                    if not collides(cx, cy):
+                        yield cx, cy
+
+    def cells(self, monitor):
+        """Yield valid centers row by row, reporting rows; stops early if the nest is stopped."""
+        xs = self.xs
+        for cy, row in zip(self.ys, self.rows):
+            if monitor.row():
+                return
+            for i0, i1, before, after in row:
+                for cx in before:
+                    yield cx, cy
+                for i in range(i0, i1):
+                    yield xs[i], cy
+                for cx in after:
+                    yield cx, cy
+
+
+# ==========================================
+# PLACED-DISC CLEARANCE GRID
+# ==========================================
+
+# How far beyond r + spacing a clearance grid tracks placed discs, in disc radii
+CLEARANCE_REACH_RADII = 2.0
+
+
+class _ClearanceGrid:
+    """
+    Distance from each center of one scan grid to the edge of the nearest
+    placed disc, updated as discs are placed (a pure-Python, array('d')
+    counterpart of _ClearanceRaster).
+
+    add() only lowers the cells within `reach` of the new disc's edge, so a
+    stored value is exact whenever it is at most reach. A larger value (inf
+    when nothing is near) only says no disc edge is within reach. Collision
+    and snugness tests on the grid become one lookup; off-grid points get
+    None and callers fall back to the exact calculation.
+    """
+
+    def __init__(self, xs, ys, reach):
+        self.xs = xs
+        self.ys = ys
+        self.reach = reach
+        self.cols = {x: i for i, x in enumerate(xs)}
+        self.rows = {y: j for j, y in enumerate(ys)}
+        self.values = array('d', [math.inf]) * (len(xs) * len(ys))
+
+    def add(self, px, py, pr):
+        """Lower the clearance of every cell within reach of a new disc's edge."""
+        xs, ys, values = self.xs, self.ys, self.values
+        nx = len(xs)
+        # Pad the window so rounding never drops a cell exactly at reach
+        limit = pr + self.reach + TANGENT_TOLERANCE
+        j0 = bisect.bisect_left(ys, py - limit)
+        j1 = bisect.bisect_right(ys, py + limit)
+        for j in range(j0, j1):
+            dy = ys[j] - py
+            if abs(dy) > limit:
+                continue
+            half = math.sqrt(limit * limit - dy * dy)
+            i0 = bisect.bisect_left(xs, px - half)
+            i1 = bisect.bisect_right(xs, px + half)
+            dy_sq = dy * dy
+            base = j * nx
+            for i in range(i0, i1):
+                dist = math.sqrt((xs[i] - px) ** 2 + dy_sq) - pr
+                if dist < values[base + i]:
+                    values[base + i] = dist
+
+    def clearance(self, x, y):
+        """Stored clearance at grid center (x, y), or None off the grid."""
+        i = self.cols.get(x)
+        j = self.rows.get(y)
+        if i is None or j is None:
+            return None
+        return self.values[j * len(self.xs) + i]
+
+
+def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0, progress=None, cancel=None):
     """
     Smart circle-packing algorithm for polygon boundaries.
 
@@ -305,23 +1568,30 @@ def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0):
 
     Supports 'max' quantity: fixed-qty pads are placed first, then max pads fill remaining space.
 
+    progress / cancel work as in _nest_discs (when called through _nest_discs,
+    its monitor is used instead). Called directly, the engine owns its monitor
+    and sends the final "done" report itself, however the nest ends.
+
     Returns list of placed discs as (pad_size, cx, cy, r).
     """
-    # Separate fixed and max pads
-    fixed_pads = [p for p in pads if p['qty'] != 'max']
-    max_pads = [p for p in pads if p['qty'] == 'max']
-
-    discs = []
-    for pad in fixed_pads:
-        pad_size, qty = pad['size'], pad['qty']
-        diameter = get_disc_diameter(pad_size, material, settings)
-        for _ in range(qty):
-            discs.append((pad_size, diameter))
-
-    discs.sort(key=lambda x: -x[1])  # Largest first
+    if "nest_monitor" not in settings:
+        monitor = _NestMonitor(progress=progress, cancel=cancel)
+        result = None
+        try:
+            result = _nest_discs_polygon(pads, material, dict(settings, nest_monitor=monitor), polygon, spacing_mm)
+            return result
+        finally:
+            monitor.finish(len(result[0]) if result is not None else monitor.placed)
+
+    discs, max_pad = _expand_pads(pads, material, settings)
     placed = []
     fixed_total = len(discs)
     fixed_placed = 0
+    monitor = settings["nest_monitor"]
+    monitor.start(fixed_total)
+
+    max_dia = get_disc_diameter(max_pad['size'], material, settings) if max_pad else 0
+    index = _DiscIndex(_index_cell_size(discs, max_dia, spacing_mm), spacing_mm)
 
     # Get bounding box of polygon for search limits
     min_x = min(p[0] for p in polygon)
@@ -337,8 +1607,97 @@ def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0):
     # Size threshold - small pads use edge-seeking behavior
     size_threshold = settings.get("dart_threshold", 18.0)
 
-    # Use 1mm grid steps for accuracy (worth the extra time for scrap efficiency)
-    step = 1
+    # Grid step from the effort level: 1mm for accuracy (worth the extra time
+    # for scrap efficiency), coarser for fast previews
+    effort = _effort(settings)
+    step = effort["grid_step"]
+
+    # Sub-millimetre resolution switches to a coarse-to-fine search (see _refine_position)
+    resolution = _nesting_resolution(material, settings)
+    refine = resolution < 1
+
+    def grid_axes(r, grid_step):
+        """Center coordinates (xs, ys) of the scan grid of radius r."""
+        return (_grid_axis(min_x + spacing_mm, max_x, r, grid_step),
+                _grid_axis(min_y + spacing_mm, max_y, r, grid_step))
+
+    # Boundary distances per (radius, grid step), computed once per nest
+    fields = {}
+
+    def field_for(r, grid_step=step):
+        """Signed distance field on the scan grid of radius r."""
+        field = fields.get((r, grid_step))
+        if field is None:
+            field = fields[(r, grid_step)] = _PolygonField(polygon, *grid_axes(r, grid_step))
+        return field
+
+    # Valid center spans per (radius, grid step), computed once per nest
+    row_spans = {}
+
+    def spans_for(r, grid_step=step):
+        """Row spans of centers where a disc of radius r fits the polygon."""
+        spans = row_spans.get((r, grid_step))
+        if spans is None:
+            xs, ys = grid_axes(r, grid_step)
+            spans = row_spans[(r, grid_step)] = _RowSpans(polygon, xs, ys, r + spacing_mm)
+        return spans
+
+    # "bitset" keeps per-radius row bitsets of usable centers; other engines scan the spans
+    use_bitset = settings.get("nesting_engine", "raster") == "bitset" and not refine
+    bitsets = {}
+
+    def bitset_for(r):
+        """Row bitsets for radius r: grid cells outside the spans start blocked, then only collisions change."""
+        bitset = bitsets.get(r)
+        if bitset is None:
+            spans = spans_for(r)
+            valid_rows = [spans.valid_mask(j) for j in range(len(spans.ys))]
+            bitset = bitsets[r] = _RowBitset(r, spans.xs, spans.ys, spacing_mm, valid_rows)
+            for _, px, py, pr in placed:
+                bitset.block_disc(px, py, pr)
+        return bitset
+
+    def candidate_cells(r, grid_step=step):
+        """Centers where radius r fits the polygon, in row-by-row scan order (see _RowSpans)."""
+        if use_bitset:
+            return spans_for(r).free_cells(bitset_for(r), lambda cx, cy: index.collides(cx, cy, r), monitor)
+        return spans_for(r, grid_step).cells(monitor)
+
+    # Distance to the nearest placed disc edge per (radius, grid step), kept up to date by record()
+    clearances = {}
+
+    def clearance_for(r, grid_step=step):
+        """Clearance grid on the scan grid of radius r."""
+        grid = clearances.get((r, grid_step))
+        if grid is None:
+            spans = spans_for(r, grid_step)
+            reach = (r + spacing_mm) + CLEARANCE_REACH_RADII * r
+            grid = clearances[(r, grid_step)] = _ClearanceGrid(spans.xs, spans.ys, reach)
+            for _, px, py, pr in placed:
+                grid.add(px, py, pr)
+        return grid
+
+    def fits(cx, cy, r):
+        """Polygon fit and collision check, for any center."""
+        return field_for(r).signed_distance(cx, cy) >= r + spacing_mm and not index.collides(cx, cy, r)
+
+    def free(cx, cy, r, grid_step=step):
+        """Collision check for a candidate center (candidates already fit the polygon; bitset candidates are pre-filtered)."""
+        if use_bitset:
+            return True
+        clearance = clearance_for(r, grid_step).clearance(cx, cy)
+        need = r + spacing_mm
+        if clearance is None or abs(clearance - need) <= TANGENT_TOLERANCE:
+            return not index.collides(cx, cy, r)  # Off the grid, or too close to call on the lookup
+        return clearance > need
+
+    def record(pad_size, cx, cy, r):
+        placed.append((pad_size, cx, cy, r))
+        index.add(pad_size, cx, cy, r)
+        for bitset in bitsets.values():
+            bitset.block_disc(cx, cy, r)
+        for grid in clearances.values():
+            grid.add(cx, cy, r)
 
     def calc_snugness(cx, cy, r, placed_discs):
         """
@@ -348,6 +1707,11 @@ def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0):
         if not placed_discs:
             return 0  # No penalty if no discs placed yet
 
+        grid = clearance_for(r)
+        clearance = grid.clearance(cx, cy)
+        if clearance is not None and clearance <= grid.reach:
+            return clearance - r - spacing_mm
+
         min_gap = float('inf')
         for _, px, py, pr in placed_discs:
             dist = math.sqrt((cx - px) ** 2 + (cy - py) ** 2)
@@ -355,159 +1719,148 @@ def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0):
             min_gap = min(min_gap, gap)
         return min_gap
 
+    def score_large(cx, cy, r, placed_discs):
+        """Distance to centroid (lower = better)."""
+        return math.sqrt((cx - centroid_x) ** 2 + (cy - centroid_y) ** 2)
+
+    def score_small(cx, cy, r, placed_discs):
+        """Edge, corner and snugness score for small discs (lower = better)."""
+        # 1. Distance to nearest edge (prefer close to edges)
+        edge_dist = abs(field_for(r).signed_distance(cx, cy))
+        edge_gap = edge_dist - r - spacing_mm  # Gap beyond disc radius
+
+        # 2. Distance to nearest corner/vertex (prefer corners)
+        vertex_dist = _distance_to_nearest_vertex(cx, cy, polygon)
+
+        # 3. Snugness with other discs (prefer tight packing)
+        snugness = calc_snugness(cx, cy, r, placed_discs)
+
+        # Combined score: weight edge proximity and corners heavily
+        return edge_gap * 1.0 + vertex_dist * 0.3 + snugness * 0.5
+
+    def refined_search(r, placed_discs, score):
+        """
+        Coarse-to-fine search: score feasible centers on a coarse grid, then
+        refine the best few down to the material's resolution.
+        """
+        def feasible(cx, cy):
+            return fits(cx, cy, r)
+
+        def scored(cx, cy):
+            return score(cx, cy, r, placed_discs)
+
+        for grid_step in (effort["coarse_step"], step):
+            found = [(scored(cx, cy), (cx, cy)) for cx, cy in candidate_cells(r, grid_step)
+                     if free(cx, cy, r, grid_step)]
+            if found:
+                break
+        else:
+            return None  # Nothing fits even on the 1mm grid
+
+        found.sort(key=lambda c: c[0])
+        best_pos, best_score = None, float('inf')
+        for start_score, start in found[:effort["refine_candidates"]]:
+            pos, pos_score = _refine_position(start, start_score, scored, feasible, grid_step, resolution)
+            if pos_score < best_score:
+                best_pos, best_score = pos, pos_score
+        return best_pos
+
     def find_best_position_large(r, placed_discs):
         """Find position closest to centroid (for large discs)."""
+        if refine:
+            return refined_search(r, placed_discs, score_large)
+
         best_pos = None
         best_score = float('inf')
 
-        y = min_y + spacing_mm
-        while y + r <= max_y:
-            x = min_x + spacing_mm
-            while x + r <= max_x:
-                cx, cy = x + r, y + r
+        for cx, cy in candidate_cells(r):
+            score = score_large(cx, cy, r, placed_discs)
 
-                # Score = distance to centroid (lower = better)
-                score = math.sqrt((cx - centroid_x) ** 2 + (cy - centroid_y) ** 2)
-
-                if score < best_score:
-                    if _circle_fits_in_polygon(cx, cy, r, polygon, spacing_mm):
-                        is_collision = any(
-                            (cx - px) ** 2 + (cy - py) ** 2 < (r + pr + spacing_mm) ** 2
-                            for _, px, py, pr in placed_discs
-                        )
-                        if not is_collision:
-                            best_score = score
-                            best_pos = (cx, cy)
-                x += step
-            y += step
+            if score < best_score:
+                if free(cx, cy, r):
+                    best_score = score
+                    best_pos = (cx, cy)
 
         return best_pos
 
     def find_best_position_small(r, placed_discs):
         """Find position near edges/corners with snug fit (for small discs)."""
+        if refine:
+            return refined_search(r, placed_discs, score_small)
+
         best_pos = None
         best_score = float('inf')
 
-        y = min_y + spacing_mm
-        while y + r <= max_y:
-            x = min_x + spacing_mm
-            while x + r <= max_x:
-                cx, cy = x + r, y + r
-
-                # Check validity first (fast rejection)
-                if not _circle_fits_in_polygon(cx, cy, r, polygon, spacing_mm):
-                    x += step
-                    continue
-
-                is_collision = any(
-                    (cx - px) ** 2 + (cy - py) ** 2 < (r + pr + spacing_mm) ** 2
-                    for _, px, py, pr in placed_discs
-                )
-                if is_collision:
-                    x += step
-                    continue
-
-                # Calculate score for small disc (lower = better)
-                # 1. Distance to nearest edge (prefer close to edges)
-                edge_dist = _distance_to_nearest_edge(cx, cy, polygon)
-                edge_gap = edge_dist - r - spacing_mm  # Gap beyond disc radius
+        for cx, cy in candidate_cells(r):
+            # Check validity first (fast rejection)
+            if not free(cx, cy, r):
+                continue
 
-                # 2. Distance to nearest corner/vertex (prefer corners)
-                vertex_dist = _distance_to_nearest_vertex(cx, cy, polygon)
+            score = score_small(cx, cy, r, placed_discs)
 
-                # 3. Snugness with other discs (prefer tight packing)
-                snugness = calc_snugness(cx, cy, r, placed_discs)
-
-                # Combined score: weight edge proximity and corners heavily
-                # Lower score = better position
-                score = edge_gap * 1.0 + vertex_dist * 0.3 + snugness * 0.5
-
-                if score < best_score:
-                    best_score = score
-                    best_pos = (cx, cy)
-
-                x += step
-            y += step
+            if score < best_score:
+                best_score = score
+                best_pos = (cx, cy)
 
         return best_pos
 
     # Cache longest edge for the entire nesting operation
     (longest_ex1, longest_ey1), (longest_ex2, longest_ey2), _, _ = _find_longest_edge(polygon)
 
+    def score_longest_edge(cx, cy, r, placed_discs):
+        """Distance to the longest edge plus snugness (lower = better)."""
+        dist_to_edge = _distance_point_to_segment(cx, cy, longest_ex1, longest_ey1, longest_ex2, longest_ey2)
+        return dist_to_edge + calc_snugness(cx, cy, r, placed_discs) * 0.3
+
     def find_best_position_longest_edge(r, placed_discs):
         """
         Fill from longest edge inward.
         Prioritizes positions closest to the longest edge, with snug packing.
         """
+        if refine:
+            return refined_search(r, placed_discs, score_longest_edge)
+
         best_pos = None
         best_score = float('inf')
 
-        # Use 1mm grid for accuracy (early-exit optimization keeps it fast)
-        edge_step = 1
+        for cx, cy in candidate_cells(r):
+            # Quick score check - skip if can't possibly be better
+            dist_to_edge = _distance_point_to_segment(cx, cy, longest_ex1, longest_ey1, longest_ex2, longest_ey2)
+            if dist_to_edge >= best_score:
+                continue
 
-        y = min_y + spacing_mm
-        while y + r <= max_y:
-            x = min_x + spacing_mm
-            while x + r <= max_x:
-                cx, cy = x + r, y + r
+            # Check validity
+            if not free(cx, cy, r):
+                continue
 
-                # Quick score check - skip if can't possibly be better
-                dist_to_edge = _distance_point_to_segment(cx, cy, longest_ex1, longest_ey1, longest_ex2, longest_ey2)
-                if dist_to_edge >= best_score:
-                    x += edge_step
-                    continue
-
-                # Check validity
-                if not _circle_fits_in_polygon(cx, cy, r, polygon, spacing_mm):
-                    x += edge_step
-                    continue
-
-                is_collision = any(
-                    (cx - px) ** 2 + (cy - py) ** 2 < (r + pr + spacing_mm) ** 2
-                    for _, px, py, pr in placed_discs
-                )
-                if is_collision:
-                    x += edge_step
-                    continue
-
-                # Full score with snugness
-                snugness = 0
-                if placed_discs:
-                    min_gap = float('inf')
-                    for _, px, py, pr in placed_discs:
-                        dist = math.sqrt((cx - px) ** 2 + (cy - py) ** 2)
-                        gap = dist - (r + pr + spacing_mm)
-                        min_gap = min(min_gap, gap)
-                    snugness = min_gap
-
-                score = dist_to_edge + snugness * 0.3
-
-                if score < best_score:
-                    best_score = score
-                    best_pos = (cx, cy)
+            # Full score with snugness
+            score = dist_to_edge + calc_snugness(cx, cy, r, placed_discs) * 0.3
 
-                x += edge_step
-            y += edge_step
+            if score < best_score:
+                best_score = score
+                best_pos = (cx, cy)
 
         return best_pos
 
     # Place fixed pads
     for pad_size, dia in discs:
+        if monitor.step(len(placed)):
+            break
         r = dia / 2
         if pad_size >= size_threshold:
             best_pos = find_best_position_large(r, placed)
         else:
             best_pos = find_best_position_small(r, placed)
+        if monitor.stopped():
+            break  # The scan was cut short, so its best position is not the engine's answer
 
         if best_pos:
-            placed.append((pad_size, best_pos[0], best_pos[1], r))
+            record(pad_size, best_pos[0], best_pos[1], r)
             fixed_placed += 1
 
     # Fill remaining space with max pad (if any)
-    if max_pads:
-        max_pad = max_pads[0]
+    if max_pad:
         max_size = max_pad['size']
-        max_dia = get_disc_diameter(max_size, material, settings)
         max_r = max_dia / 2
 
         # Choose fill strategy based on setting
@@ -517,24 +1870,461 @@ def _nest_discs_polygon(pads, material, settings, polygon, spacing_mm=1.0):
         else:
             find_fn = find_best_position_large  # center_out
 
-        while True:
+        while not monitor.step(len(placed)):
             best_pos = find_fn(max_r, placed)
+            if monitor.stopped():
+                break  # Partial scan, as above
             if best_pos:
-                placed.append((max_size, best_pos[0], best_pos[1], max_r))
+                record(max_size, best_pos[0], best_pos[1], max_r)
             else:
                 break  # No more room for max pads
 
     return placed, fixed_placed, fixed_total
 
 
+# ==========================================
+# COMPACTION ("GRAVITY SHAKE")
+# ==========================================
+
+# Passes over all discs before compaction stops trying to settle
+COMPACTION_MAX_PASSES = 50
+# A pass in which no disc moves further than this (mm) counts as settled
+COMPACTION_SETTLE_MM = 0.01
+
+
+def _slide_distance(index, cx, cy, r, dx, dy, limit):
+    """
+    How far (up to limit) a disc can slide along the unit direction (dx, dy)
+    before it comes within spacing of a placed disc. Solved analytically per
+    neighbour; the moving disc must not be in the index.
+    """
+    spacing = index.spacing
+    reach = limit / 2 + r + index.max_r + spacing
+    best = limit
+    for _, px, py, pr in index.near(cx + dx * limit / 2, cy + dy * limit / 2, reach):
+        wx, wy = cx - px, cy - py
+        b = wx * dx + wy * dy
+        if b >= 0:
+            continue  # Moving away from this disc
+        contact = r + pr + spacing + TANGENT_TOLERANCE
+        disc = b * b - (wx * wx + wy * wy - contact * contact)
+        if disc < 0:
+            continue  # Passes it by
+        best = min(best, max(-b - math.sqrt(disc), 0.0))
+    return best
+
+
+def _slide_in_polygon(cx, cy, r, dx, dy, distance, polygon, spacing_mm):
+    """Longest slide up to distance that keeps the disc inside the polygon (bisection)."""
+    if _circle_fits_in_polygon(cx + dx * distance, cy + dy * distance, r, polygon, spacing_mm):
+        return distance
+    lo, hi = 0.0, distance
+    while hi - lo > COMPACTION_SETTLE_MM:
+        mid = (lo + hi) / 2
+        if _circle_fits_in_polygon(cx + dx * mid, cy + dy * mid, r, polygon, spacing_mm):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _compact_layout(result, pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None):
+    """
+    Gravity shake: repeatedly slide every disc toward the origin corner (up,
+    then left) or straight toward the polygon centroid until it touches a
+    neighbour or the edge, until a pass moves nothing. Room freed along the
+    far edges is then refilled with 'max' pads on the 1mm grid.
+    """
+    placed, fixed_placed, fixed_total = result
+    if not placed:
+        return result
+    placed = list(placed)
+
+    max_pads = [p for p in pads if p['qty'] == 'max']
+    max_dia = get_disc_diameter(max_pads[0]['size'], material, settings) if max_pads else 0
+    index = _DiscIndex(max([2 * d[3] for d in placed] + [max_dia]) + spacing_mm, spacing_mm)
+    for disc in placed:
+        index.add(*disc)
+
+    if polygon:
+        n = len(polygon)
+        target_x = sum(p[0] for p in polygon) / n
+        target_y = sum(p[1] for p in polygon) / n
+
+    for _ in range(COMPACTION_MAX_PASSES):
+        moved = 0.0
+        if polygon:
+            order = sorted(range(len(placed)), key=lambda i: math.hypot(placed[i][1] - target_x, placed[i][2] - target_y))
+        else:
+            order = sorted(range(len(placed)), key=lambda i: (placed[i][2], placed[i][1]))
+
+        for i in order:
+            pad_size, cx, cy, r = placed[i]
+            index.remove(pad_size, cx, cy, r)
+            if polygon:
+                dist = math.hypot(target_x - cx, target_y - cy)
+                if dist > COMPACTION_SETTLE_MM:
+                    dx, dy = (target_x - cx) / dist, (target_y - cy) / dist
+                    t = _slide_distance(index, cx, cy, r, dx, dy, dist)
+                    t = _slide_in_polygon(cx, cy, r, dx, dy, t, polygon, spacing_mm)
+                    cx, cy = cx + dx * t, cy + dy * t
+                    moved = max(moved, t)
+            else:
+                t = _slide_distance(index, cx, cy, r, 0.0, -1.0, max(cy - r - spacing_mm, 0.0))
+                cy -= t
+                u = _slide_distance(index, cx, cy, r, -1.0, 0.0, max(cx - r - spacing_mm, 0.0))
+                cx -= u
+                moved = max(moved, t, u)
+            placed[i] = (pad_size, cx, cy, r)
+            index.add(pad_size, cx, cy, r)
+
+        if moved < COMPACTION_SETTLE_MM or _monitor(settings).stopped():
+            break
+
+    # Refill freed room with extra 'max' pads
+    if max_pads:
+        max_size, max_r = max_pads[0]['size'], max_dia / 2
+        if polygon:
+            min_x = min(p[0] for p in polygon)
+            min_y = min(p[1] for p in polygon)
+            max_x = max(p[0] for p in polygon)
+            max_y = max(p[1] for p in polygon)
+            for cy in _grid_axis(min_y + spacing_mm, max_y, max_r):
+                for cx in _grid_axis(min_x + spacing_mm, max_x, max_r):
+                    if not index.collides(cx, cy, max_r) and _circle_fits_in_polygon(cx, cy, max_r, polygon, spacing_mm):
+                        placed.append((max_size, cx, cy, max_r))
+                        index.add(max_size, cx, cy, max_r)
+        else:
+            xs = _grid_axis(spacing_mm, width_mm - spacing_mm - max_r, max_r)
+            ys = _grid_axis(spacing_mm, height_mm - spacing_mm - max_r, max_r)
+            bitset = _RowBitset(max_r, xs, ys, spacing_mm)
+            for _, px, py, pr in placed:
+                bitset.block_disc(px, py, pr)
+            while True:
+                pos = bitset.first_free()
+                if pos is None:
+                    break
+                placed.append((max_size, pos[0], pos[1], max_r))
+                bitset.block_disc(pos[0], pos[1], max_r)
+
+    return placed, fixed_placed, fixed_total
+
+
+# ==========================================
+# NESTING CACHE
+# ==========================================
+
+# Settings that change disc diameters or where discs are placed
+NEST_SETTINGS_KEYS = (
+    "felt_offset", "card_to_felt_offset", "leather_wrap_multiplier",
+    "felt_thickness", "felt_thickness_unit",
+    "darts_enabled", "dart_threshold", "dart_wrap_bonus",
+    "max_fill_style", "max_fill_pattern", "nesting_engine", "nesting_resolution",
+    "compaction", "effort",
+)
+
+NEST_CACHE_SIZE = 32
+_nest_cache = OrderedDict()
+# The GUI's preview and generation threads share the cache; the lock is never held while nesting
+_nest_cache_lock = threading.Lock()
+
+
+def _nest_cache_key(pads, material, width_mm, height_mm, settings, spacing_mm, polygon):
+    """Hashable key for a nest: normalized pads, material, geometry and the relevant settings."""
+    pad_key = tuple(
+        (float(p['size']), p['qty'] if p['qty'] == 'max' else int(p['qty']))
+        for p in pads if p['qty'] == 'max' or int(p['qty']) > 0
+    )
+    if polygon:
+        geometry = ('polygon', tuple((float(x), float(y)) for x, y in polygon))
+    else:
+        geometry = ('rect', float(width_mm), float(height_mm))
+
+    settings_key = []
+    for key in NEST_SETTINGS_KEYS:
+        value = settings.get(key)
+        if isinstance(value, dict):
+            value = value.get(material)  # Per-material settings
+        settings_key.append((key, value))
+
+    return pad_key, material, geometry, float(spacing_mm), tuple(settings_key)
+
+
+def nest_discs_cached(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None,
+                      progress=None, cancel=None):
+    """
+    _nest_discs with an LRU cache, so the fit check and the SVG/G-code writers
+    share one nest per job. Returns a NestResult with a fresh placed list the
+    caller may modify. Cancelled and timed-out (partial) nests are not cached.
+    """
+    key = _nest_cache_key(pads, material, width_mm, height_mm, settings, spacing_mm, polygon)
+    with _nest_cache_lock:
+        result = _nest_cache.get(key)
+        if result is not None:
+            _nest_cache.move_to_end(key)
+    if result is None:
+        result = _nest_discs(pads, material, width_mm, height_mm, settings, spacing_mm, polygon=polygon,
+                             progress=progress, cancel=cancel)
+        if result.timed_out or (cancel is not None and cancel.is_set()):
+            return NestResult(list(result[0]), result[1], result[2], result.timed_out)
+        with _nest_cache_lock:
+            _nest_cache[key] = result
+            while len(_nest_cache) > NEST_CACHE_SIZE:
+                _nest_cache.popitem(last=False)
+
+    placed, fixed_placed, fixed_total = result
+    return NestResult(list(placed), fixed_placed, fixed_total)
+
+
+def _nest_cache_put(pads, material, width_mm, height_mm, settings, spacing_mm, polygon, result):
+    """Store a layout found by a search as the nest for these arguments."""
+    key = _nest_cache_key(pads, material, width_mm, height_mm, settings, spacing_mm, polygon)
+    with _nest_cache_lock:
+        _nest_cache[key] = result
+        _nest_cache.move_to_end(key)
+        while len(_nest_cache) > NEST_CACHE_SIZE:
+            _nest_cache.popitem(last=False)
+
+
+def clear_nest_cache():
+    """Drop all cached nests."""
+    with _nest_cache_lock:
+        _nest_cache.clear()
+
+
+# ==========================================
+# MULTI-START SEARCH
+# ==========================================
+
+# Relative jitter on disc diameters when ordering a multi-start trial
+MULTISTART_JITTER = 0.3
+
+
+def _layout_score(placed, fixed_placed):
+    """
+    Rank a layout: most fixed pads first, then highest utilization.
+    Every trial nests the same sheet, so total disc area ranks utilization.
+    """
+    return fixed_placed, sum(r * r for _, _, _, r in placed)
+
+
+def _multistart_trial(pads, material, width_mm, height_mm, settings, spacing_mm, polygon, seed, cancel=None):
+    """One perturbed nest. Odd seeds on rectangles also scan the sheet transposed."""
+    trial_settings = dict(settings, nest_seed=seed)
+    if polygon or seed % 2 == 0:
+        return _nest_discs(pads, material, width_mm, height_mm, trial_settings, spacing_mm, polygon=polygon,
+                           cancel=cancel)
+    result = _nest_discs(pads, material, height_mm, width_mm, trial_settings, spacing_mm, cancel=cancel)
+    return NestResult([(pad_size, cy, cx, r) for pad_size, cx, cy, r in result[0]], result[1], result[2],
+                      result.timed_out)
+
+
+def nest_discs_multistart(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None, budget_s=None,
+                          cancel=None):
+    """
+    Best-of-N nesting: runs perturbed disc orderings and scan directions until
+    the time budget (settings["multistart_budget"] seconds) runs out, and
+    returns the layout with the most fixed pads placed, then the highest
+    utilization. The plain greedy nest is always one of the candidates.
+
+    Trials run in the shared worker pool when called from the main process,
+    and one after another inside a worker. Pool trials still running when the
+    search ends are stopped through a shared cancel event, so they free their
+    workers instead of running past the budget. The search stops early once every
+    fixed pad fits and there is no 'max' pad left to improve. The winner is
+    stored in the nest cache (unless it timed out), so the SVG/G-code writers
+    reuse it. Setting cancel stops the search and returns the best layout so far.
+    """
+    if budget_s is None:
+        budget_s = settings.get("multistart_budget", 5.0)
+    deadline = time.monotonic() + budget_s
+    has_max = any(p['qty'] == 'max' for p in pads)
+    args = (pads, material, width_mm, height_mm, settings, spacing_mm, polygon)
+
+    best = nest_discs_cached(pads, material, width_mm, height_mm, settings, spacing_mm, polygon=polygon)
+    best_score = _layout_score(best[0], best[1])
+    greedy_score = best_score
+
+    def finished():
+        if cancel is not None and cancel.is_set():
+            return True
+        return (not has_max and best[1] == best[2]) or time.monotonic() >= deadline
+
+    def consider(result):
+        nonlocal best, best_score
+        score = _layout_score(result[0], result[1])
+        if score > best_score:
+            best, best_score = result, score
+
+    seed = 1
+    if multiprocessing.parent_process() is None:
+        from concurrent.futures import FIRST_COMPLETED, wait
+        from concurrent.futures.process import BrokenProcessPool
+        from generation_jobs import get_pool, get_manager, pool_size, reset_pool
+
+        pending = set()
+        trial_cancel = None
+        broken = False
+        try:
+            pool = get_pool()
+            trial_cancel = get_manager().Event()
+            while not finished():
+                while len(pending) < 2 * pool_size():
+                    pending.add(pool.submit(_multistart_trial, *args, seed, trial_cancel))
+                    seed += 1
+                timeout = max(0.0, deadline - time.monotonic())
+                if cancel is not None:
+                    timeout = min(timeout, PROGRESS_INTERVAL_S)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    consider(future.result())
+        except BrokenProcessPool as e:
+            print(f"Warning: worker pool broken, running multi-start in-process: {e}", file=sys.stderr)
+            broken = True
+        except OSError as e:
+            print(f"Warning: worker pool unavailable, running multi-start in-process: {e}", file=sys.stderr)
+        finally:
+            # Drop queued trials and stop running ones, so they don't hold workers past the budget
+            for future in pending:
+                future.cancel()
+            if trial_cancel is not None:
+                try:
+                    trial_cancel.set()
+                except (OSError, EOFError):
+                    pass  # Manager already gone
+        if broken:
+            reset_pool()  # Start a fresh pool next time
+
+    while not finished():
+        consider(_multistart_trial(*args, seed, cancel=cancel))
+        seed += 1
+
+    if best_score > greedy_score and not best.timed_out and not (cancel is not None and cancel.is_set()):
+        _nest_cache_put(pads, material, width_mm, height_mm, settings, spacing_mm, polygon, best)
+
+    placed, fixed_placed, fixed_total = best
+    return NestResult(list(placed), fixed_placed, fixed_total, best.timed_out)
+
+
+def nest_discs_for_fit(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None,
+                       progress=None, cancel=None):
+    """
+    Nest for a fit check: the cached greedy nest, then a multi-start search if
+    the greedy order strands fixed pads (or always, with settings["multistart_always"]).
+    A multi-start budget of 0 disables the search, and so does cancelling or a
+    timed-out greedy nest (the search could not get further in its budget).
+    """
+    result = nest_discs_cached(pads, material, width_mm, height_mm, settings, spacing_mm, polygon=polygon,
+                               progress=progress, cancel=cancel)
+    if result.timed_out or (cancel is not None and cancel.is_set()):
+        return result
+    if settings.get("multistart_budget", 5.0) > 0 and (result[1] < result[2] or settings.get("multistart_always", False)):
+        result = nest_discs_multistart(pads, material, width_mm, height_mm, settings, spacing_mm, polygon=polygon,
+                                       cancel=cancel)
+    return result
+
+
+# ==========================================
+# STRIP PACKING (ROLL STOCK)
+# ==========================================
+
+def _layout_length(placed, spacing_mm):
+    """Sheet length a layout actually uses: its lowest disc edge plus the edge spacing."""
+    return max(cy + r for _, _, cy, r in placed) + spacing_mm
+
+
+def nest_min_length(pads, material, width_mm, settings, spacing_mm=1.0, tolerance_mm=1.0,
+                    progress=None, cancel=None):
+    """
+    Strip packing for roll stock: the shortest sheet length at a fixed width
+    that holds every fixed-quantity pad.
+
+    Bounded binary search over _nest_discs between the size/area lower bound
+    and a one-disc-per-row upper bound. Each feasible probe warm-starts the
+    next: the upper bound drops straight to the length that layout actually
+    uses rather than the probed length. 'max' pads then fill the final strip.
+
+    Returns (length_mm, NestResult) with the length rounded up to a whole mm,
+    or (None, None) if there are no fixed-quantity pads or a disc is wider
+    than the roll. If the effort time cap cuts the first (longest) probe short,
+    returns (None, that timed-out NestResult). A later probe that times out
+    ends the search at the best length found so far.
+
+    progress and cancel are passed to every probe (see _nest_discs). Setting
+    cancel stops the search: a cancelled first probe returns (None, its
+    partial NestResult), a later one the best length found so far with its
+    layout (no 'max' fill, not cached).
+    """
+    fixed_pads = [p for p in pads if p['qty'] != 'max']
+    discs, _ = _expand_pads(fixed_pads, material, settings)
+    if not discs:
+        return None, None
+    diameters = [dia for _, dia in discs]
+    if diameters[0] + 2 * spacing_mm > width_mm:
+        return None, None
+
+    disc_area = sum(math.pi * (d / 2 + spacing_mm / 2) ** 2 for d in diameters)
+    lo = max(diameters[0] + 2 * spacing_mm, disc_area / (width_mm - spacing_mm) + spacing_mm)
+    hi = sum(d + spacing_mm for d in diameters) + spacing_mm
+
+    def cancelled():
+        return cancel is not None and cancel.is_set()
+
+    best = _nest_discs(fixed_pads, material, width_mm, hi, settings, spacing_mm, progress=progress, cancel=cancel)
+    if best[1] < best[2]:
+        return None, (best if best.timed_out or cancelled() else None)
+    hi = _layout_length(best[0], spacing_mm)
+
+    while hi - lo > tolerance_mm and not cancelled():
+        mid = (lo + hi) / 2
+        result = _nest_discs(fixed_pads, material, width_mm, mid, settings, spacing_mm,
+                             progress=progress, cancel=cancel)
+        if cancelled():
+            break  # A cancelled probe is no verdict either
+        if result.timed_out and result[1] < result[2]:
+            break  # No verdict for this length
+        if result[1] == result[2]:
+            best, hi = result, min(mid, _layout_length(result[0], spacing_mm))
+        else:
+            lo = mid
+
+    length = math.ceil(hi - 1e-9)
+    if cancelled():
+        return length, NestResult(list(best[0]), best[1], best[2])
+    result = nest_discs_cached(pads, material, width_mm, length, settings, spacing_mm,
+                               progress=progress, cancel=cancel)
+    if cancelled():
+        return length, NestResult(list(best[0]), best[1], best[2])
+    if result[1] < result[2]:
+        # The engine placed everything at the searched length but not at the
+        # rounded one - keep the searched layout (without 'max' fill)
+        result = NestResult(list(best[0]), best[1], best[2])
+        _nest_cache_put(pads, material, width_mm, length, settings, spacing_mm, None, result)
+    return length, result
+
+
+def fit_precheck(pads, material, width_mm, height_mm, settings, spacing_mm=1.0, polygon=None):
+    """
+    Instant bounds check before nesting (see nest_bounds).
+    Returns (IMPOSSIBLE, reason) or (NEEDS_NEST, None).
+    """
+    discs, _ = _expand_pads(pads, material, settings)
+    return check_fit_bounds([dia for _, dia in discs], width_mm, height_mm, spacing_mm, polygon=polygon)
+
+
 def can_all_pads_fit(pads, material, width_mm, height_mm, settings, polygon=None):
-    placed, fixed_placed, fixed_total = _nest_discs(pads, material, width_mm, height_mm, settings, polygon=polygon)
+    # Reject certainly-impossible jobs without nesting
+    verdict, _ = fit_precheck(pads, material, width_mm, height_mm, settings, polygon=polygon)
+    if verdict == IMPOSSIBLE:
+        return False
+
+    placed, fixed_placed, fixed_total = nest_discs_for_fit(pads, material, width_mm, height_mm, settings, polygon=polygon)
     # Check if all fixed-quantity pads fit (max pads are flexible by definition)
     return fixed_placed == fixed_total
 
 
 def generate_svg(pads, material, width_mm, height_mm, filename, hole_dia_preset, settings, polygon=None):
-    placed, _, _ = _nest_discs(pads, material, width_mm, height_mm, settings, polygon=polygon)
+    placed, _, _ = nest_discs_cached(pads, material, width_mm, height_mm, settings, polygon=polygon)
 
     compatibility_mode = settings.get("compatibility_mode", False)
 
@@ -698,12 +2488,13 @@ def compute_remaining_pads(original_pads, placed):
     return remaining
 
 
-def try_nest_partial(pads, material, width_mm, height_mm, settings, polygon=None):
+def try_nest_partial(pads, material, width_mm, height_mm, settings, polygon=None, progress=None, cancel=None):
     """
     Attempt to place as many pads as possible, return placed and remaining.
 
     This is the main entry point for scrap mode - it tries to fit pads on a scrap
     and returns both what was placed and what's left for the next scrap.
+    Honors settings["effort"] like the other nesting entry points.
 
     Args:
         pads: List of {'size': float, 'qty': int|'max'} dicts
@@ -711,6 +2502,7 @@ def try_nest_partial(pads, material, width_mm, height_mm, settings, polygon=None
         width_mm, height_mm: Scrap dimensions in mm
         settings: App settings dict
         polygon: Optional polygon coordinates for irregular shapes
+        progress, cancel: Optional progress callback and cancel token (see _nest_discs)
 
     Returns:
         (placed, remaining_pads, any_placed)
@@ -718,14 +2510,139 @@ def try_nest_partial(pads, material, width_mm, height_mm, settings, polygon=None
         - remaining_pads: [{'size': float, 'qty': int}, ...] - what's left
         - any_placed: bool - True if at least one pad was placed
     """
-    placed, fixed_placed, fixed_total = _nest_discs(
-        pads, material, width_mm, height_mm, settings, polygon=polygon
+    placed, fixed_placed, fixed_total = nest_discs_cached(
+        pads, material, width_mm, height_mm, settings, polygon=polygon, progress=progress, cancel=cancel
     )
     remaining = compute_remaining_pads(pads, placed)
     any_placed = len(placed) > 0
     return placed, remaining, any_placed
 
 
+# ==========================================
+# MULTI-SHEET PLANNING
+# ==========================================
+
+def _merge_pads(*pad_lists):
+    """Combine fixed-quantity pad lists, summing quantities per size."""
+    counts = {}
+    for pads in pad_lists:
+        for pad in pads:
+            counts[pad['size']] = counts.get(pad['size'], 0) + pad['qty']
+    return [{'size': size, 'qty': qty} for size, qty in counts.items() if qty > 0]
+
+
+def _placed_pads(placed):
+    """Pad list of exactly the discs in a layout."""
+    return _merge_pads([{'size': pad_size, 'qty': 1} for pad_size, _, _, _ in placed])
+
+
+def _plan_sheets_greedy(pads, material, width_mm, height_mm, settings, polygon=None, progress=None, cancel=None):
+    """
+    Fill one sheet at a time (like scrap mode). Returns [placed, ...] or None.
+    Setting cancel stops after the current sheet and returns the sheets so far.
+    """
+    sheets = []
+    remaining = pads
+    while remaining:
+        placed, remaining, any_placed = try_nest_partial(remaining, material, width_mm, height_mm, settings,
+                                                         polygon=polygon, progress=progress, cancel=cancel)
+        if cancel is not None and cancel.is_set():
+            return sheets + [placed] if any_placed else sheets
+        if not any_placed:
+            return None  # Some pad doesn't fit even on an empty sheet
+        sheets.append(placed)
+    return sheets
+
+
+def _plan_sheets_balanced(discs, count, material, width_mm, height_mm, settings, polygon=None,
+                          progress=None, cancel=None):
+    """
+    Plan `count` sheets at once: deal the discs (largest first) to the sheet
+    with the least disc area so far, nest every sheet, then offer whatever
+    overflowed to the emptiest sheets. Returns [placed, ...] or None (also
+    when cancelled).
+    """
+    loads = [0.0] * count
+    groups = [[] for _ in range(count)]
+    for pad_size, dia in discs:
+        i = loads.index(min(loads))
+        groups[i].append({'size': pad_size, 'qty': 1})
+        loads[i] += dia * dia
+
+    sheets = []
+    overflow = []
+    for i, group in enumerate(groups):
+        groups[i] = _merge_pads(group)
+        placed, remaining, _ = try_nest_partial(groups[i], material, width_mm, height_mm, settings,
+                                                polygon=polygon, progress=progress, cancel=cancel)
+        if cancel is not None and cancel.is_set():
+            return None
+        sheets.append(placed)
+        overflow = _merge_pads(overflow, remaining)
+
+    for i in sorted(range(count), key=lambda i: len(sheets[i])):
+        if not overflow:
+            break
+        combined = _merge_pads(groups[i], overflow)
+        placed, remaining, _ = try_nest_partial(combined, material, width_mm, height_mm, settings,
+                                                polygon=polygon, progress=progress, cancel=cancel)
+        if cancel is not None and cancel.is_set():
+            return None
+        if sum(p['qty'] for p in remaining) < sum(p['qty'] for p in overflow):
+            sheets[i], overflow = placed, remaining
+            groups[i] = _placed_pads(placed)
+
+    return None if overflow else sheets
+
+
+def plan_sheets(pads, material, width_mm, height_mm, settings, polygon=None, progress=None, cancel=None):
+    """
+    Split an order across the fewest sheets of one size, planned in one pass.
+
+    A sheet-by-sheet fill (try_nest_partial / compute_remaining_pads) gives
+    an upper bound on the sheet count. Balanced plans are then tried from one
+    sheet fewer (but never below the area lower bound) up to that count, so
+    the load is spread evenly and the last sheet isn't nearly empty. The
+    sheet-by-sheet plan is the fallback. A 'max' pad fills the first sheet
+    only, as in scrap mode.
+
+    progress and cancel are passed to every sheet's nest (see _nest_discs).
+    Setting cancel stops the planning: during the sheet-by-sheet fill it
+    returns the sheets filled so far (not the whole order), afterwards the
+    complete sheet-by-sheet plan.
+
+    Returns:
+        [placed, ...] one list of (pad_size, cx, cy, r) per sheet,
+        or None if some pad doesn't fit even on an empty sheet.
+    """
+    greedy = _plan_sheets_greedy(pads, material, width_mm, height_mm, settings, polygon=polygon,
+                                 progress=progress, cancel=cancel)
+    if greedy is None or len(greedy) <= 1 or (cancel is not None and cancel.is_set()):
+        return greedy
+
+    fixed_pads = [p for p in pads if p['qty'] != 'max']
+    max_pads = [p for p in pads if p['qty'] == 'max']
+    discs, _ = _expand_pads(fixed_pads, material, settings)
+    lower = min_sheet_count([dia for _, dia in discs], width_mm, height_mm, polygon=polygon)
+
+    for count in range(max(lower, len(greedy) - 1), len(greedy) + 1):
+        sheets = _plan_sheets_balanced(discs, count, material, width_mm, height_mm, settings, polygon=polygon,
+                                       progress=progress, cancel=cancel)
+        if cancel is not None and cancel.is_set():
+            break
+        if sheets is None:
+            continue
+        if max_pads:
+            placed, fixed_placed, fixed_total = nest_discs_cached(
+                _placed_pads(sheets[0]) + max_pads, material, width_mm, height_mm, settings, polygon=polygon,
+                progress=progress, cancel=cancel)
+            if fixed_placed == fixed_total and not (cancel is not None and cancel.is_set()):
+                sheets[0] = placed
+        return sheets
+
+    return greedy
+
+
 def generate_svg_from_placed(placed, material, width_mm, height_mm, filename, hole_dia_preset, settings, polygon=None):
     """
     Generate SVG from pre-computed placed discs.
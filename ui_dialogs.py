@@ -8,6 +8,7 @@ from config import (
     DEFAULT_SETTINGS, LIGHTBURN_COLORS, RESONANCE_MESSAGES,
     save_settings, save_presets
 )
+from svg_engine import MIN_NESTING_RESOLUTION_MM, HAVE_NUMPY
 
 # ==========================================
 # CROSS-PLATFORM SCROLL HELPER
@@ -152,7 +153,14 @@ class OptionsWindow:
         self.engraving_on_var = tk.BooleanVar(value=self.settings["engraving_on"])
         self.compatibility_mode_var = tk.BooleanVar(value=self.settings.get("compatibility_mode", False))
         self.max_fill_style_var = tk.StringVar(value=self.settings.get("max_fill_style", "center_out"))
+        self.max_fill_pattern_var = tk.StringVar(value=self.settings.get("max_fill_pattern", "scan"))
+        self.nesting_engine_var = tk.StringVar(value=self.settings.get("nesting_engine", "raster"))
+        self.effort_var = tk.StringVar(value=self.settings.get("effort", "balanced"))
+        self.compaction_var = tk.BooleanVar(value=self.settings.get("compaction", False))
+        self.multistart_budget_var = tk.DoubleVar(value=self.settings.get("multistart_budget", 5.0))
+        self.multistart_always_var = tk.BooleanVar(value=self.settings.get("multistart_always", False))
         self.engraving_font_size_vars = {}
+        self.nesting_resolution_vars = {}
         self.engraving_loc_vars = {}
 
         # Dart Engraving Vars
@@ -276,15 +284,85 @@ class OptionsWindow:
         tk.Checkbutton(export_frame, text="Enable Inkscape/Compatibility Mode (unitless SVG)", variable=self.compatibility_mode_var, bg="#F0EAD6").pack(anchor='w')
 
         # Max Fill Style
-        max_fill_frame = tk.LabelFrame(main_frame, text="Max Fill Style (Polygon Shapes)", bg="#F0EAD6", padx=5, pady=5)
+        max_fill_frame = tk.LabelFrame(main_frame, text="Max Fill Style (Polygon Shapes, Scan pattern only)", bg="#F0EAD6", padx=5, pady=5)
         max_fill_frame.pack(fill="x", pady=5)
         tk.Radiobutton(max_fill_frame, text="Center Out (fill from center outward)",
                        variable=self.max_fill_style_var, value="center_out", bg="#F0EAD6").pack(anchor='w')
         tk.Radiobutton(max_fill_frame, text="Longest Edge (fill from longest edge inward)",
                        variable=self.max_fill_style_var, value="longest_edge", bg="#F0EAD6").pack(anchor='w')
 
+        # Max Fill Pattern
+        max_pattern_frame = tk.LabelFrame(main_frame, text="Max Fill Pattern", bg="#F0EAD6", padx=5, pady=5)
+        max_pattern_frame.pack(fill="x", pady=5)
+        tk.Radiobutton(max_pattern_frame, text="Scan (place max pads one at a time)",
+                       variable=self.max_fill_pattern_var, value="scan", bg="#F0EAD6").pack(anchor='w')
+        tk.Radiobutton(max_pattern_frame, text="Lattice (hex/square grid in one pass, usually denser; ignores Max Fill Style)",
+                       variable=self.max_fill_pattern_var, value="lattice", bg="#F0EAD6").pack(anchor='w')
+
+        # Nesting Engine
+        engine_frame = tk.LabelFrame(main_frame, text="Nesting Engine", bg="#F0EAD6", padx=5, pady=5)
+        engine_frame.pack(fill="x", pady=5)
+        tk.Radiobutton(engine_frame, text="Raster (1mm grid scan)",
+                       variable=self.nesting_engine_var, value="raster", bg="#F0EAD6").pack(anchor='w')
+        tk.Radiobutton(engine_frame, text="Tangent (exact contact, no grid; rectangles only)",
+                       variable=self.nesting_engine_var, value="tangent", bg="#F0EAD6").pack(anchor='w')
+        numpy_text = "NumPy Clearance Raster (same layout as Raster; needs NumPy; rectangles only)"
+        if not HAVE_NUMPY:
+            numpy_text = "NumPy Clearance Raster (NumPy not installed; runs as Raster)"
+        tk.Radiobutton(engine_frame, text=numpy_text, variable=self.nesting_engine_var, value="numpy",
+                       state="normal" if HAVE_NUMPY else "disabled", bg="#F0EAD6").pack(anchor='w')
+        tk.Radiobutton(engine_frame, text="Bitset (same layout as Raster, faster; rectangles and shapes)",
+                       variable=self.nesting_engine_var, value="bitset", bg="#F0EAD6").pack(anchor='w')
+
+        # Nesting Effort
+        effort_frame = tk.LabelFrame(main_frame, text="Nesting Effort", bg="#F0EAD6", padx=5, pady=5)
+        effort_frame.pack(fill="x", pady=5)
+        tk.Radiobutton(effort_frame, text="Fast (2mm grid, 5s cap; previews and quotes)",
+                       variable=self.effort_var, value="fast", bg="#F0EAD6").pack(anchor='w')
+        tk.Radiobutton(effort_frame, text="Balanced (1mm grid, 60s cap)",
+                       variable=self.effort_var, value="balanced", bg="#F0EAD6").pack(anchor='w')
+        tk.Radiobutton(effort_frame, text="Thorough (0.5mm refinement, 5 min cap; final cut files)",
+                       variable=self.effort_var, value="thorough", bg="#F0EAD6").pack(anchor='w')
+
+        # Nesting Resolution (per material)
+        resolution_frame = tk.LabelFrame(main_frame, text=f"Nesting Resolution (mm, {MIN_NESTING_RESOLUTION_MM}-1.0; below 1.0 = fine search)", bg="#F0EAD6", padx=5, pady=5)
+        resolution_frame.pack(fill="x", pady=5)
+        for i, material in enumerate(materials):
+            tk.Label(resolution_frame, text=f"{material.replace('_', ' ').capitalize()}:", bg="#F0EAD6").grid(row=i, column=0, sticky='w', padx=5, pady=2)
+            resolution_var = tk.DoubleVar(value=self.settings.get("nesting_resolution", {}).get(material, 1.0))
+            self.nesting_resolution_vars[material] = resolution_var
+            tk.Entry(resolution_frame, textvariable=resolution_var, width=8).grid(row=i, column=1, sticky='w', padx=5, pady=2)
+
+        # Compaction
+        compaction_frame = tk.LabelFrame(main_frame, text="Compaction", bg="#F0EAD6", padx=5, pady=5)
+        compaction_frame.pack(fill="x", pady=5)
+        tk.Checkbutton(compaction_frame, text="Slide discs together after nesting (toward corner / shape center) and refill with max pads",
+                       variable=self.compaction_var, bg="#F0EAD6").pack(anchor='w')
+
+        # Multi-Start Search
+        multistart_frame = tk.LabelFrame(main_frame, text="Multi-Start Search (best of many nest orders)", bg="#F0EAD6", padx=5, pady=5)
+        multistart_frame.pack(fill="x", pady=5)
+        tk.Label(multistart_frame, text="Time budget (s, 0 = off):", bg="#F0EAD6").grid(row=0, column=0, sticky='w', padx=5, pady=2)
+        tk.Entry(multistart_frame, textvariable=self.multistart_budget_var, width=8).grid(row=0, column=1, sticky='w', padx=5, pady=2)
+        tk.Checkbutton(multistart_frame, text="Always search (not only when pads don't fit)",
+                       variable=self.multistart_always_var, bg="#F0EAD6").grid(row=1, column=0, columnspan=2, sticky='w')
+
 
     def save_options(self):
+        # Validate nesting resolutions before changing anything
+        resolutions = {}
+        for material, var in self.nesting_resolution_vars.items():
+            try:
+                resolutions[material] = var.get()
+            except tk.TclError:
+                resolutions[material] = None
+            if resolutions[material] is None or not MIN_NESTING_RESOLUTION_MM <= resolutions[material] <= 1.0:
+                messagebox.showerror("Invalid Input",
+                                     f"Nesting resolution for {material.replace('_', ' ')} must be a number "
+                                     f"from {MIN_NESTING_RESOLUTION_MM} to 1.0 mm.",
+                                     parent=self.top)
+                return
+
         # Sizing
         self.settings["units"] = self.unit_var.get()
         self.settings["felt_offset"] = self.felt_offset_var.get()
@@ -323,6 +401,16 @@ class OptionsWindow:
 
         # Max Fill
         self.settings["max_fill_style"] = self.max_fill_style_var.get()
+        self.settings["max_fill_pattern"] = self.max_fill_pattern_var.get()
+
+        # Nesting Engine
+        self.settings["nesting_engine"] = self.nesting_engine_var.get()
+        self.settings.setdefault("nesting_resolution", {})
+        self.settings["nesting_resolution"].update(resolutions)
+        self.settings["effort"] = self.effort_var.get()
+        self.settings["compaction"] = self.compaction_var.get()
+        self.settings["multistart_budget"] = self.multistart_budget_var.get()
+        self.settings["multistart_always"] = self.multistart_always_var.get()
 
         self.save_callback()
         self.update_callback()
@@ -366,6 +454,16 @@ class OptionsWindow:
 
             # Max Fill
             self.max_fill_style_var.set(DEFAULT_SETTINGS.get("max_fill_style", "center_out"))
+            self.max_fill_pattern_var.set(DEFAULT_SETTINGS.get("max_fill_pattern", "scan"))
+
+            # Nesting Engine
+            self.nesting_engine_var.set(DEFAULT_SETTINGS.get("nesting_engine", "raster"))
+            for material, var in self.nesting_resolution_vars.items():
+                var.set(DEFAULT_SETTINGS["nesting_resolution"][material])
+            self.effort_var.set(DEFAULT_SETTINGS.get("effort", "balanced"))
+            self.compaction_var.set(DEFAULT_SETTINGS.get("compaction", False))
+            self.multistart_budget_var.set(DEFAULT_SETTINGS.get("multistart_budget", 5.0))
+            self.multistart_always_var.set(DEFAULT_SETTINGS.get("multistart_always", False))
 
 class LayerColorWindow:
     def __init__(self, parent, settings, save_callback):